@@ -1,27 +1,21 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+# pandas and matplotlib are imported inside the functions that need them,
+# so batch workers and headless runs start without loading either
 import numpy as np
+import json
 import os
+from types import MappingProxyType
 import sys
 import time
+from collections import OrderedDict
 from datetime import datetime
 import warnings
-warnings.filterwarnings('ignore')
 
-# Try to import optional packages, install if not available
+# colorama is optional: without it Colors falls back to raw ANSI codes
 try:
     from colorama import init, Fore, Back, Style
     COLORAMA_AVAILABLE = True
 except ImportError:
-    print("Installing colorama...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "colorama"])
-    from colorama import init, Fore, Back, Style
-    COLORAMA_AVAILABLE = True
-    print("colorama installed successfully!")
-
-# Initialize colorama
-init(autoreset=True)
+    COLORAMA_AVAILABLE = False
 
 # Custom ANSI color codes as fallback
 class Colors:
@@ -58,6 +52,52 @@ class Colors:
     STRESS_MED = BLUE
     STRESS_HIGH = '\033[38;5;27m' if COLORAMA_AVAILABLE else BLUE
     STRESS_SEVERE = '\033[38;5;90m' if COLORAMA_AVAILABLE else '\033[95m'
+    
+    # Indexed by SeverityClassifier level (MILD .. SEVERE)
+    ANXIETY_LEVELS = (ANXIETY_LOW, ANXIETY_MED, ANXIETY_HIGH, ANXIETY_SEVERE)
+    STRESS_LEVELS = (STRESS_LOW, STRESS_MED, STRESS_HIGH, STRESS_SEVERE)
+
+# -------------------------------
+# 🚦 Severity Classification
+# -------------------------------
+
+class SeverityClassifier:
+    """Vectorized severity labels shared by the cards, summaries and analyzer"""
+    THRESHOLDS = np.array([4.0, 6.0, 8.0])
+    LEVELS = ("MILD", "MODERATE", "HIGH", "SEVERE")
+    RISKS = ("Low", "Medium", "High")
+    
+    @staticmethod
+    def level(scores):
+        """Severity code per score: 0 MILD (<4), 1 MODERATE, 2 HIGH, 3 SEVERE (>=8)"""
+        scores = np.asarray(scores)
+        codes = np.zeros(scores.shape, dtype=np.int8)
+        for threshold in SeverityClassifier.THRESHOLDS:
+            codes += scores >= threshold
+        return int(codes) if codes.ndim == 0 else codes
+    
+    @staticmethod
+    def status(anxiety, stress):
+        """Status level of the average of both scores"""
+        return SeverityClassifier.level((np.asarray(anxiety) + np.asarray(stress)) / 2)
+    
+    @staticmethod
+    def risk(anxiety, stress):
+        """Risk code from the worse score: 0 Low (<6), 1 Medium, 2 High (>=8)"""
+        worse = SeverityClassifier.level(np.maximum(anxiety, stress))
+        return np.maximum(worse - 1, 0)
+    
+    @staticmethod
+    def classify(anxiety, stress):
+        """Status and risk codes for a whole population, plus counts per label"""
+        status = np.atleast_1d(SeverityClassifier.status(anxiety, stress))
+        risk = np.atleast_1d(SeverityClassifier.risk(anxiety, stress))
+        return {
+            'status': status,
+            'risk': risk,
+            'status_counts': np.bincount(status.ravel(), minlength=len(SeverityClassifier.LEVELS)),
+            'risk_counts': np.bincount(risk.ravel(), minlength=len(SeverityClassifier.RISKS))
+        }
 
 # -------------------------------
 #  Premium Styling Functions
@@ -168,42 +208,11 @@ class UI:
         avg = (anxiety + stress) / 2
         
         # Determine status and color
-        if avg >= 8:
-            status = "⚡ SEVERE STRESS"
-            status_color = Colors.ANXIETY_SEVERE
-            emoji = "🔥"
-        elif avg >= 6:
-            status = "⚠️  HIGH STRESS"
-            status_color = Colors.ANXIETY_HIGH
-            emoji = "⚠️"
-        elif avg >= 4:
-            status = "📊 MODERATE"
-            status_color = Colors.ANXIETY_MED
-            emoji = "⚡"
-        else:
-            status = "🌿 MILD"
-            status_color = Colors.ANXIETY_LOW
-            emoji = "🌱"
-        
-        # Anxiety color
-        if anxiety >= 8:
-            anxiety_color = Colors.ANXIETY_SEVERE
-        elif anxiety >= 6:
-            anxiety_color = Colors.ANXIETY_HIGH
-        elif anxiety >= 4:
-            anxiety_color = Colors.ANXIETY_MED
-        else:
-            anxiety_color = Colors.ANXIETY_LOW
-        
-        # Stress color
-        if stress >= 8:
-            stress_color = Colors.STRESS_SEVERE
-        elif stress >= 6:
-            stress_color = Colors.STRESS_HIGH
-        elif stress >= 4:
-            stress_color = Colors.STRESS_MED
-        else:
-            stress_color = Colors.STRESS_LOW
+        status, emoji = (("🌿 MILD", "🌱"), ("📊 MODERATE", "⚡"),
+                         ("⚠️  HIGH STRESS", "⚠️"), ("⚡ SEVERE STRESS", "🔥"))[SeverityClassifier.level(avg)]
+        status_color = Colors.ANXIETY_LEVELS[SeverityClassifier.level(avg)]
+        anxiety_color = Colors.ANXIETY_LEVELS[SeverityClassifier.level(anxiety)]
+        stress_color = Colors.STRESS_LEVELS[SeverityClassifier.level(stress)]
         
         print(f"\n{Colors.CYAN}{'╔' + '═' * 56 + '╗'}{Colors.END}")
         print(f"{Colors.CYAN}{'║'}{Colors.END} {Colors.BOLD}{Colors.YELLOW}{'PERSON PROFILE':^54}{Colors.END} {Colors.CYAN}{'║'}{Colors.END}")
@@ -281,29 +290,163 @@ relaxations = {
     ]
 }
 
+def _coefficient_table(effectiveness, default, categories):
+    """Read-only array of effectiveness by category code (last slot: unknown)"""
+    table = np.array([effectiveness[name] for name in categories] + [default])
+    table.setflags(write=False)
+    return table
+
+class TechniqueRegistry:
+    """Immutable technique categories with integer codes and coefficient tables
+
+    Category names are encoded to integer codes once (encode), after which
+    the engines only index the dense per-method K_A tables. Code UNKNOWN
+    stands for any category not in relaxations and carries each method's
+    default effectiveness.
+    """
+    CATEGORIES = tuple(relaxations)
+    UNKNOWN = len(CATEGORIES)
+    CODES = MappingProxyType({name: code for code, name in enumerate(CATEGORIES)})
+
+    # Different effectiveness based on technique type
+    EFFECTIVENESS = MappingProxyType({
+        "Euler": MappingProxyType({
+            "Breathing": 0.45,
+            "Meditation": 0.50,
+            "Physical": 0.40,
+            "Sensory": 0.35,
+            "Creative": 0.30,
+            "Social": 0.38
+        }),
+        "RK4": MappingProxyType({
+            "Breathing": 0.48,
+            "Meditation": 0.52,
+            "Physical": 0.42,
+            "Sensory": 0.37,
+            "Creative": 0.32,
+            "Social": 0.40
+        })
+    })
+    DEFAULT_EFFECTIVENESS = MappingProxyType({"Euler": 0.4, "RK4": 0.42})
+
+    # Anxiety rate constant per code, multiplied by responsiveness at run time
+    K_A = MappingProxyType({
+        "Euler": _coefficient_table(EFFECTIVENESS["Euler"], DEFAULT_EFFECTIVENESS["Euler"], CATEGORIES),
+        "RK4": _coefficient_table(EFFECTIVENESS["RK4"], DEFAULT_EFFECTIVENESS["RK4"], CATEGORIES)
+    })
+    # Stress reduces at a fixed fraction of the anxiety rate
+    STRESS_RATIO = MappingProxyType({"Euler": 0.85, "RK4": 0.82})
+
+    @staticmethod
+    def encode(categories):
+        """Category name(s) to integer code(s); integer codes pass through
+
+        Codes must lie in 0..UNKNOWN; anything else raises ValueError
+        rather than wrapping around or overrunning the coefficient tables.
+        """
+        if isinstance(categories, str):
+            return TechniqueRegistry.CODES.get(categories, TechniqueRegistry.UNKNOWN)
+        if isinstance(categories, (int, np.integer)):
+            if not 0 <= categories <= TechniqueRegistry.UNKNOWN:
+                TechniqueRegistry._check_codes(categories)
+            return categories
+        categories = np.asarray(categories)
+        if np.issubdtype(categories.dtype, np.integer):
+            TechniqueRegistry._check_codes(categories)
+            return categories
+        # Look up each distinct name once instead of once per element
+        names, inverse = np.unique(categories, return_inverse=True)
+        codes = np.array([TechniqueRegistry.CODES.get(name, TechniqueRegistry.UNKNOWN)
+                          for name in names], dtype=np.int8)
+        return codes[inverse.reshape(-1)].reshape(categories.shape)
+
+    @staticmethod
+    def _check_codes(codes):
+        """ValueError unless every code is a valid table row"""
+        codes = np.asarray(codes)
+        if codes.size and (codes.min() < 0 or codes.max() > TechniqueRegistry.UNKNOWN):
+            raise ValueError(f"Technique codes must be in 0..{TechniqueRegistry.UNKNOWN}, "
+                             f"got {codes.min()}..{codes.max()}")
+
+    @staticmethod
+    def decode(codes):
+        """Integer code(s) back to category names ("Unknown" for UNKNOWN)"""
+        names = np.array(TechniqueRegistry.CATEGORIES + ("Unknown",))
+        return names[np.asarray(codes)]
+
+def build_schedule(steps, categories=None):
+    """(category, technique) plan: round-robin, or techniques for given categories
+
+    With categories (names or codes, one per step) each category cycles
+    through its own techniques in order.
+    """
+    if categories is None:
+        categories = TechniqueRegistry.CATEGORIES
+        selected_techniques = []
+        for i in range(steps):
+            category = categories[i % len(categories)]
+            techs = relaxations[category]
+            technique = techs[i % len(techs)]
+            selected_techniques.append((category, technique))
+        return selected_techniques
+
+    selected_techniques = []
+    used = {}
+    for category in TechniqueRegistry.decode(TechniqueRegistry.encode(list(categories)))[:steps]:
+        category = str(category)
+        techs = relaxations[category]
+        selected_techniques.append((category, techs[used.get(category, 0) % len(techs)]))
+        used[category] = used.get(category, 0) + 1
+    return selected_techniques
+
 # -------------------------------
 # 🔢 FIXED Numerical Methods with Realistic Models
 # -------------------------------
 
 class WellnessModel:
-    """FIXED numerical models for anxiety/stress simulation"""
+    """FIXED numerical models for anxiety/stress simulation
+
+    technique_type may be a category name or a TechniqueRegistry code.
+    """
+    
+    # Engine for integrate(): "numpy", "numba" (compiled, optional) or "auto"
+    backend = "numpy"
+    BACKENDS = ("numpy", "numba", "auto")
+    # Optional StepCache used by integrate() when none is passed explicitly
+    step_cache = None
+    # Methods accepted by integrate() (case-insensitive)
+    METHODS = ("Euler", "RK4", "RK45", "Implicit")
+    
+    @staticmethod
+    def set_backend(name):
+        """Select the integrate() backend at run time"""
+        if name not in WellnessModel.BACKENDS:
+            raise ValueError(f"Unknown backend {name!r}; choose from {', '.join(WellnessModel.BACKENDS)}")
+        WellnessModel.backend = name
+    
+    @staticmethod
+    def _use_compiled(backend=None):
+        """True if the compiled kernels should (and can) be used"""
+        backend = backend or WellnessModel.backend
+        # Without numba both "numba" and "auto" fall back to NumPy
+        return backend != "numpy" and _compiled_kernels() is not None
+    
+    @staticmethod
+    def set_step_cache(maxsize):
+        """Memoize integrate() steps in a StepCache of maxsize entries (None: off)"""
+        WellnessModel.step_cache = None if maxsize is None else StepCache(maxsize)
+        return WellnessModel.step_cache
     
     @staticmethod
-    def euler_method(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7):
+    def euler_method(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7, cache=None):
         """FIXED Euler method with realistic psychology"""
-        # Different effectiveness based on technique type
-        effectiveness = {
-            "Breathing": 0.45,
-            "Meditation": 0.50,
-            "Physical": 0.40,
-            "Sensory": 0.35,
-            "Creative": 0.30,
-            "Social": 0.38
-        }
+        if cache is not None:
+            return cache.step("Euler", anxiety, stress, technique_type, dt, responsiveness)
         # Euler method
         # Get effectiveness based on technique and adjust by responsiveness
-        k_a = effectiveness.get(technique_type, 0.4) * responsiveness
-        k_s = k_a * 0.85  # Stress reduces slightly slower
+        code = TechniqueRegistry.encode(technique_type)
+        k_a = float(TechniqueRegistry.K_A["Euler"][code]) * responsiveness
+        k_s = k_a * TechniqueRegistry.STRESS_RATIO["Euler"]  # Stress reduces slightly slower
         
         # REALISTIC MODEL: Anxiety reduces faster when stress is lower
         # Stress reduction benefits from anxiety reduction
@@ -321,22 +464,14 @@ class WellnessModel:
         return round(anxiety_new, 2), round(stress_new, 2)
     
     @staticmethod
-    def rk4_method(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7):
+    def rk4_method(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7, cache=None):
         """FIXED RK4 method with proper coupled ODEs"""
-        # Different effectiveness based on technique type
-        effectiveness = {
-            "Breathing": 0.48,
-            "Meditation": 0.52,
-            "Physical": 0.42,
-            "Sensory": 0.37,
-            "Creative": 0.32,
-            "Social": 0.40
-        }
-        
+        if cache is not None:
+            return cache.step("RK4", anxiety, stress, technique_type, dt, responsiveness)
         # Get effectiveness based on technique
-        base_k = effectiveness.get(technique_type, 0.42)
+        base_k = float(TechniqueRegistry.K_A["RK4"][TechniqueRegistry.encode(technique_type)])
         k_a = base_k * responsiveness  # Adjusted by personal responsiveness
-        k_s = k_a * 0.82  # Stress reduces at different rate
+        k_s = k_a * TechniqueRegistry.STRESS_RATIO["RK4"]  # Stress reduces at different rate
         
         # REALISTIC COUPLED ODEs for anxiety-stress dynamics
         def derivatives(state, t):
@@ -372,9 +507,779 @@ class WellnessModel:
         # Ensure non-negative values with realistic minimum
         anxiety_new = max(anxiety_new, 0.5)
         stress_new = max(stress_new, 0.5)
-        
+
         return round(anxiety_new, 2), round(stress_new, 2)
 
+    @staticmethod
+    def _rate_constants(method, technique_type, responsiveness):
+        """k_a and k_s for one category or an array of categories/codes"""
+        codes = TechniqueRegistry.encode(technique_type)
+        k_a = TechniqueRegistry.K_A[method][codes] * responsiveness
+        return k_a, k_a * TechniqueRegistry.STRESS_RATIO[method]
+
+    @staticmethod
+    def euler_batch(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7):
+        """Vectorized Euler step for a whole population (same results as euler_method)"""
+        anxiety = np.asarray(anxiety, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        responsiveness = np.asarray(responsiveness, dtype=float)
+
+        k_a, k_s = WellnessModel._rate_constants("Euler", technique_type, responsiveness)
+
+        anxiety_reduction = k_a * anxiety * (1 - 0.1 * stress/10)
+        stress_reduction = k_s * stress * (1 + 0.05 * anxiety/10)
+
+        anxiety_new = anxiety - anxiety_reduction * dt
+        stress_new = stress - stress_reduction * dt - 0.08 * anxiety_reduction
+
+        anxiety_new = np.maximum(anxiety_new, 0.5)
+        stress_new = np.maximum(stress_new, 0.5)
+
+        return np.round(anxiety_new, 2), np.round(stress_new, 2)
+
+    @staticmethod
+    def rk4_batch(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7):
+        """Vectorized RK4 step for a whole population (same results as rk4_method)"""
+        anxiety = np.asarray(anxiety, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        responsiveness = np.asarray(responsiveness, dtype=float)
+
+        k_a, k_s = WellnessModel._rate_constants("RK4", technique_type, responsiveness)
+
+        # Same coupled ODEs as rk4_method, evaluated on whole columns
+        def derivatives(a, s):
+            da_dt = -k_a * a * (1 - 0.15 * s/10)
+            ds_dt = -k_s * s * (1 + 0.08 * a/10)
+            return da_dt, ds_dt
+
+        half = 0.5 * dt
+        k1a, k1s = derivatives(anxiety, stress)
+        k2a, k2s = derivatives(anxiety + half * k1a, stress + half * k1s)
+        k3a, k3s = derivatives(anxiety + half * k2a, stress + half * k2s)
+        k4a, k4s = derivatives(anxiety + dt * k3a, stress + dt * k3s)
+
+        anxiety_new = anxiety + (dt / 6.0) * (k1a + 2*k2a + 2*k3a + k4a)
+        stress_new = stress + (dt / 6.0) * (k1s + 2*k2s + 2*k3s + k4s)
+
+        anxiety_new = np.maximum(anxiety_new, 0.5)
+        stress_new = np.maximum(stress_new, 0.5)
+
+        return np.round(anxiety_new, 2), np.round(stress_new, 2)
+
+    @staticmethod
+    def implicit_batch(anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7,
+                       tol=1e-10, max_iter=25):
+        """Vectorized backward Euler step of the RK4 coupled ODEs
+
+        Solves y_new = y + dt * f(y_new) by Newton's method with the
+        analytic 2x2 Jacobian, so the step stays stable for any dt
+        (multi-week sessions included). Like rk45_method the result is
+        the unclamped, unrounded solution; it is first order in dt.
+        """
+        anxiety = np.asarray(anxiety, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        responsiveness = np.asarray(responsiveness, dtype=float)
+
+        k_a, k_s = WellnessModel._rate_constants("RK4", technique_type, responsiveness)
+
+        a, s = anxiety, stress
+        for _ in range(max_iter):
+            # Residual G(y) = y - y_old - dt * f(y)
+            g_a = a - anxiety + dt * k_a * a * (1 - 0.15 * s/10)
+            g_s = s - stress + dt * k_s * s * (1 + 0.08 * a/10)
+            # dG/dy = I - dt * df/dy
+            j_aa = 1 + dt * k_a * (1 - 0.15 * s/10)
+            j_as = -dt * k_a * a * 0.15/10
+            j_sa = dt * k_s * s * 0.08/10
+            j_ss = 1 + dt * k_s * (1 + 0.08 * a/10)
+            det = j_aa * j_ss - j_as * j_sa
+            delta_a = (g_a * j_ss - g_s * j_as) / det
+            delta_s = (g_s * j_aa - g_a * j_sa) / det
+            a, s = a - delta_a, s - delta_s
+            if np.max(np.abs(delta_a), initial=0) <= tol and np.max(np.abs(delta_s), initial=0) <= tol:
+                return a, s
+        raise RuntimeError(f"Backward Euler Newton iteration did not converge in {max_iter} "
+                           f"iterations (dt={dt})")
+
+    # Bisection steps for event times: locates them to 2^-52 of a step
+    ROOT_BISECTIONS = 52
+    # Dormand-Prince 5(4) tableau with its 4th order continuous extension
+    _DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+    _DP_A = [
+        np.array([]),
+        np.array([1/5]),
+        np.array([3/40, 9/40]),
+        np.array([44/45, -56/15, 32/9]),
+        np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+        np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656])
+    ]
+    _DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+    _DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+    _DP_P = np.array([
+        [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+        [0, 0, 0, 0],
+        [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+        [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+        [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+        [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+        [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]
+    ])
+
+    @staticmethod
+    def _coupled_rhs(y, k_a, k_s):
+        """Right-hand side of the RK4 coupled ODEs for an (N, 2) state array"""
+        a, s = y[:, 0], y[:, 1]
+        return np.column_stack((-k_a * a * (1 - 0.15 * s/10),
+                                -k_s * s * (1 + 0.08 * a/10)))
+
+    @staticmethod
+    def rk45_method(anxiety, stress, technique_type="Physical", t_eval=None,
+                    rtol=1e-6, atol=1e-8, responsiveness=0.7):
+        """Adaptive Dormand-Prince RK45 for the RK4 coupled ODEs
+
+        technique_type is one category held for the whole run, or a sequence
+        of categories where session i covers t in [i, i+1]. Results are
+        reported at t_eval (default: every session boundary) using dense
+        output, so the step size is chosen by the error control alone.
+        Unlike the fixed-step methods the continuous solution is returned
+        unclamped and unrounded.
+
+        Returns (anxiety_at_t, stress_at_t, nfev) where nfev counts
+        right-hand-side evaluations per person.
+        """
+        scalar_input = np.ndim(anxiety) == 0 and np.ndim(stress) == 0
+        y = np.column_stack((np.atleast_1d(np.asarray(anxiety, dtype=float)),
+                             np.atleast_1d(np.asarray(stress, dtype=float))))
+        n = len(y)
+        responsiveness = np.broadcast_to(np.asarray(responsiveness, dtype=float), (n,))
+
+        if isinstance(technique_type, (str, int, np.integer)):
+            sessions = [technique_type]
+            horizon = 1.0 if t_eval is None else float(np.max(t_eval))
+            bounds = np.array([0.0, horizon])
+        else:
+            sessions = list(technique_type)
+            horizon = float(len(sessions))
+            bounds = np.arange(len(sessions) + 1, dtype=float)
+        base_k = TechniqueRegistry.K_A["RK4"][TechniqueRegistry.encode(sessions)]
+
+        t_eval = bounds if t_eval is None else np.sort(np.atleast_1d(np.asarray(t_eval, dtype=float)))
+        if t_eval[0] < 0 or t_eval[-1] > horizon:
+            raise ValueError(f"t_eval must lie within [0, {horizon:g}]")
+
+        out = np.empty((n, len(t_eval), 2))
+        out[:, t_eval == 0] = y[:, None, :]
+        next_eval = np.full(n, np.searchsorted(t_eval, 0.0, side='right'))
+
+        def coefficients(session, resp):
+            k_a = base_k[session] * resp
+            return k_a, k_a * TechniqueRegistry.STRESS_RATIO["RK4"]
+
+        t = np.zeros(n)
+        session = np.zeros(n, dtype=int)
+        k_a, k_s = coefficients(session, responsiveness)
+        f = WellnessModel._coupled_rhs(y, k_a, k_s)
+        nfev = np.full(n, 2)
+        h = WellnessModel._dp_initial_step(y, f, k_a, k_s, rtol, atol)
+
+        active = t < horizon
+        while active.any():
+            idx = np.flatnonzero(active)
+            yi, ti = y[idx], t[idx]
+            # Never step across a session boundary: the RHS jumps there
+            boundary = bounds[session[idx] + 1]
+            hi = np.minimum(h[idx], boundary - ti)
+            hits_boundary = hi >= boundary - ti
+
+            y_new, K, accept, factor = WellnessModel._dp_step(
+                yi, f[idx], hi, k_a[idx], k_s[idx], rtol, atol)
+            nfev[idx] += 6
+            # A step shortened to land on a boundary keeps the longer proposal
+            h[idx] = np.where(accept & hits_boundary, np.maximum(h[idx], hi * factor), hi * factor)
+
+            acc = np.flatnonzero(accept)
+            if len(acc) == 0:
+                continue
+            people = idx[acc]
+            t_old, h_acc = ti[acc], hi[acc]
+            t_new = np.where(hits_boundary[acc], boundary[acc], t_old + h_acc)
+
+            # Dense output for every requested time inside (t_old, t_new]
+            Q = np.einsum('kni,kj->nij', K[:, acc], WellnessModel._DP_P)
+            done = np.searchsorted(t_eval, t_new, side='right')
+            pending = next_eval[people]
+            while True:
+                fill = np.flatnonzero(pending < done)
+                if len(fill) == 0:
+                    break
+                j = pending[fill]
+                theta = (t_eval[j] - t_old[fill]) / h_acc[fill]
+                dense = WellnessModel._dp_dense(yi[acc][fill], h_acc[fill], Q[fill], theta)
+                out[people[fill], j] = np.where((t_eval[j] >= t_new[fill])[:, None],
+                                                y_new[acc][fill], dense)
+                pending[fill] += 1
+            next_eval[people] = pending
+
+            y[people], t[people], f[people] = y_new[acc], t_new, K[6, acc]
+
+            # Entering a new session changes the coefficients, so the
+            # first-same-as-last derivative has to be re-evaluated
+            crossed = people[hits_boundary[acc] & (t_new < horizon)]
+            if len(crossed):
+                session[crossed] += 1
+                k_a[crossed], k_s[crossed] = coefficients(session[crossed], responsiveness[crossed])
+                f[crossed] = WellnessModel._coupled_rhs(y[crossed], k_a[crossed], k_s[crossed])
+                nfev[crossed] += 1
+
+            active = t < horizon
+
+        anxiety_out, stress_out = out[:, :, 0], out[:, :, 1]
+        if scalar_input:
+            return anxiety_out[0], stress_out[0], int(nfev[0])
+        return anxiety_out, stress_out, nfev
+
+    @staticmethod
+    def _dp_initial_step(y, f, k_a, k_s, rtol, atol):
+        """Initial step size (Hairer, Norsett & Wanner, II.4); costs one RHS evaluation"""
+        scale = atol + rtol * np.abs(y)
+        d0 = np.sqrt(np.mean((y / scale) ** 2, axis=1))
+        d1 = np.sqrt(np.mean((f / scale) ** 2, axis=1))
+        h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.maximum(d1, 1e-300))
+        f1 = WellnessModel._coupled_rhs(y + h0[:, None] * f, k_a, k_s)
+        d2 = np.sqrt(np.mean(((f1 - f) / scale) ** 2, axis=1)) / h0
+        d12 = np.maximum(d1, d2)
+        h1 = np.where(d12 <= 1e-15, np.maximum(1e-6, h0 * 1e-3),
+                      (0.01 / np.maximum(d12, 1e-300)) ** 0.2)
+        return np.minimum(100 * h0, h1)
+
+    @staticmethod
+    def _dp_step(y, f, h, k_a, k_s, rtol, atol):
+        """One Dormand-Prince attempt; costs six RHS evaluations
+
+        Returns (y_new, stages K, accepted mask, step size factor).
+        """
+        K = np.empty((7, len(y), 2))
+        K[0] = f
+        for stage in range(1, 6):
+            dy = np.tensordot(WellnessModel._DP_A[stage], K[:stage], axes=(0, 0))
+            K[stage] = WellnessModel._coupled_rhs(y + h[:, None] * dy, k_a, k_s)
+        y_new = y + h[:, None] * np.tensordot(WellnessModel._DP_B, K[:6], axes=(0, 0))
+        K[6] = WellnessModel._coupled_rhs(y_new, k_a, k_s)
+
+        err = h[:, None] * np.tensordot(WellnessModel._DP_E, K, axes=(0, 0))
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err_norm = np.sqrt(np.mean((err / scale) ** 2, axis=1))
+        accept = (err_norm < 1) | (h <= 1e-12)
+
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * err_norm ** -0.2, 0.2, 10.0)
+        factor = np.where(accept, factor, np.minimum(factor, 1.0))
+        return y_new, K, accept, factor
+
+    @staticmethod
+    def _dp_dense(y, h, Q, theta):
+        """Dense output at fraction theta of a step from its (N, 2, 4) coefficients Q"""
+        powers = theta[:, None] ** np.arange(1, 5)
+        return y + h[:, None] * np.einsum('nij,nj->ni', Q, powers)
+
+    @staticmethod
+    def time_to_target(anxiety, stress, schedule, target=4.0, responsiveness=0.7,
+                       rtol=1e-6, atol=1e-8):
+        """Sessions until the average of anxiety and stress first reaches target
+
+        Integrates the RK4 coupled ODEs adaptively like rk45_method, but a
+        person stops at the step whose end is at or below target and the
+        crossing is located on that step's dense output by bisection.
+        Finished people drop out of the batch, so each step costs less as
+        the cohort recovers. schedule holds one category per session and
+        sets the horizon; people still above target at its end get nan.
+
+        Returns (times, nfev) where nfev counts right-hand-side evaluations
+        per person.
+        """
+        scalar_input = np.ndim(anxiety) == 0 and np.ndim(stress) == 0
+        y = np.column_stack((np.atleast_1d(np.asarray(anxiety, dtype=float)),
+                             np.atleast_1d(np.asarray(stress, dtype=float))))
+        n = len(y)
+        responsiveness = np.broadcast_to(np.asarray(responsiveness, dtype=float), (n,))
+        sessions = [schedule] if isinstance(schedule, (str, int, np.integer)) else list(schedule)
+        base_k = TechniqueRegistry.K_A["RK4"][TechniqueRegistry.encode(sessions)]
+        horizon = float(len(sessions))
+
+        def excess(state):
+            return state.sum(axis=-1) / 2 - target
+
+        times = np.full(n, np.nan)
+        times[excess(y) <= 0] = 0.0
+        t = np.zeros(n)
+        session = np.zeros(n, dtype=int)
+        k_a = base_k[session] * responsiveness
+        k_s = k_a * TechniqueRegistry.STRESS_RATIO["RK4"]
+        f = WellnessModel._coupled_rhs(y, k_a, k_s)
+        nfev = np.full(n, 2)
+        h = WellnessModel._dp_initial_step(y, f, k_a, k_s, rtol, atol)
+
+        active = np.isnan(times)
+        while active.any():
+            idx = np.flatnonzero(active)
+            yi, ti = y[idx], t[idx]
+            boundary = session[idx] + 1.0
+            hi = np.minimum(h[idx], boundary - ti)
+            hits_boundary = hi >= boundary - ti
+
+            y_new, K, accept, factor = WellnessModel._dp_step(
+                yi, f[idx], hi, k_a[idx], k_s[idx], rtol, atol)
+            nfev[idx] += 6
+            h[idx] = np.where(accept & hits_boundary, np.maximum(h[idx], hi * factor), hi * factor)
+
+            acc = np.flatnonzero(accept)
+            people = idx[acc]
+            t_new = np.where(hits_boundary[acc], boundary[acc], ti[acc] + hi[acc])
+
+            # The model only decays, so a step that ends at or below target
+            # holds the first crossing; bisect its dense polynomial
+            crossed = np.flatnonzero(excess(y_new[acc]) <= 0)
+            if len(crossed):
+                step = acc[crossed]
+                Q = np.einsum('kni,kj->nij', K[:, step], WellnessModel._DP_P)
+                low = np.zeros(len(step))
+                high = np.ones(len(step))
+                for _ in range(WellnessModel.ROOT_BISECTIONS):
+                    mid = 0.5 * (low + high)
+                    below = excess(WellnessModel._dp_dense(yi[step], hi[step], Q, mid)) <= 0
+                    high = np.where(below, mid, high)
+                    low = np.where(below, low, mid)
+                times[idx[step]] = ti[step] + high * hi[step]
+
+            y[people], t[people], f[people] = y_new[acc], t_new, K[6, acc]
+            moved = people[hits_boundary[acc] & (t_new < horizon)]
+            if len(moved):
+                session[moved] += 1
+                k_a[moved] = base_k[session[moved]] * responsiveness[moved]
+                k_s[moved] = k_a[moved] * TechniqueRegistry.STRESS_RATIO["RK4"]
+                f[moved] = WellnessModel._coupled_rhs(y[moved], k_a[moved], k_s[moved])
+                nfev[moved] += 1
+
+            active = np.isnan(times) & (t < horizon)
+
+        if scalar_input:
+            return float(times[0]), int(nfev[0])
+        return times, nfev
+
+    @staticmethod
+    def integrate(anxiety, stress, schedule, method="RK4", dt=1, responsiveness=0.7, out=None,
+                  backend=None, cache=None):
+        """Integrate a whole technique schedule in one call
+
+        schedule holds one category (name or TechniqueRegistry code) per
+        step, either shared by everybody (length steps) or per person
+        (shape (N, steps)). The trajectory is written into a (steps+1, 2)
+        array for one person or (N, steps+1, 2) for a population, where
+        [..., i, 0] is anxiety and [..., i, 1] is stress after i steps.
+        Pass out= to fill an existing buffer instead.
+        method is "Euler", "RK4", "RK45" (adaptive, sampled at each step)
+        or "Implicit" (backward Euler, stable for large dt; unrounded).
+        backend overrides WellnessModel.backend for the fixed-step methods.
+        cache (default: WellnessModel.step_cache) memoizes Euler/RK4 steps
+        in a StepCache and takes precedence over the compiled backend.
+        """
+        # Validate before any dispatch so every backend rejects the same names
+        if str(method).upper() not in {name.upper() for name in WellnessModel.METHODS}:
+            raise ValueError(f"Unknown method {method!r}; choose from {', '.join(WellnessModel.METHODS)}")
+        # Category names are resolved once here; the step loop only sees codes
+        schedule = np.asarray(TechniqueRegistry.encode(schedule))
+        steps = schedule.shape[-1]
+        anxiety = np.asarray(anxiety, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        shape = anxiety.shape + (steps + 1, 2)
+
+        if out is None:
+            out = np.empty(shape)
+        elif out.shape != shape:
+            raise ValueError(f"out has shape {out.shape}, expected {shape}")
+
+        method = method.upper()
+        if method == "RK45":
+            if schedule.ndim != 1 or dt != 1:
+                raise ValueError("RK45 needs one shared schedule with unit sessions")
+            anxiety_t, stress_t, _ = WellnessModel.rk45_method(
+                anxiety, stress, list(schedule), responsiveness=responsiveness)
+            out[..., 0] = anxiety_t
+            out[..., 1] = stress_t
+            return out
+
+        cache = cache if cache is not None else WellnessModel.step_cache
+        if method == "IMPLICIT":
+            step_fn = WellnessModel.implicit_batch
+        elif cache is not None:
+            name = {"EULER": "Euler", "RK4": "RK4"}[method]
+            def step_fn(a, s, codes, dt, responsiveness):
+                return cache.step_batch(name, a, s, codes, dt, responsiveness)
+        elif WellnessModel._use_compiled(backend):
+            return WellnessModel._integrate_compiled(anxiety, stress, schedule, method, dt,
+                                                     responsiveness, out)
+        else:
+            step_fn = {"EULER": WellnessModel.euler_batch, "RK4": WellnessModel.rk4_batch}[method]
+        out[..., 0, 0] = anxiety
+        out[..., 0, 1] = stress
+        for i in range(steps):
+            category = schedule[i] if schedule.ndim == 1 else schedule[:, i]
+            out[..., i + 1, 0], out[..., i + 1, 1] = step_fn(
+                out[..., i, 0], out[..., i, 1], category,
+                dt=dt, responsiveness=responsiveness)
+        return out
+
+    @staticmethod
+    def _integrate_compiled(anxiety, stress, codes, method, dt, responsiveness, out):
+        """Run integrate() through the numba kernels"""
+        kernels = _compiled_kernels()
+        name = {"EULER": "Euler", "RK4": "RK4"}[method]
+        steps = codes.shape[-1]
+        population = out.shape[:-2]
+        count = int(np.prod(population))
+
+        def column(values, dtype=float):
+            # Fresh C-contiguous copies keep one compiled signature per kernel
+            return np.array(np.broadcast_to(values, population), dtype=dtype).reshape(count)
+
+        # The kernels work on flat (M, steps+1, 2) buffers; a shared
+        # schedule is passed as a single row
+        flat = out.reshape(count, steps + 1, 2) if out.flags.c_contiguous else np.empty((count, steps + 1, 2))
+        kernels[name](
+            column(anxiety),
+            column(stress),
+            column(responsiveness),
+            np.array(codes.reshape(-1, steps), dtype=np.int64),
+            TechniqueRegistry.K_A[name],
+            TechniqueRegistry.STRESS_RATIO[name],
+            float(dt),
+            flat
+        )
+        if not out.flags.c_contiguous:
+            out[...] = flat.reshape(out.shape)
+        return out
+
+# -------------------------------
+# ⚙️ Optional Compiled Backend (numba)
+# -------------------------------
+
+# Compiled results match the NumPy engines to within this absolute
+# tolerance; with the same operation order and no fastmath they are
+# bit-identical in practice
+COMPILED_TOLERANCE = 1e-12
+
+_COMPILED_KERNELS = {}
+
+def _compiled_kernels():
+    """Compile the Euler/RK4 trajectory kernels on first use (None without numba)"""
+    if "Euler" in _COMPILED_KERNELS:
+        return _COMPILED_KERNELS
+    if _COMPILED_KERNELS.get("unavailable"):
+        return None
+    try:
+        import numba
+    except ImportError:
+        _COMPILED_KERNELS["unavailable"] = True
+        return None
+
+    @numba.njit(nogil=True, cache=True)
+    def euler_trajectory(anxiety0, stress0, responsiveness, codes, k_table, ratio, dt, out):
+        for n in range(out.shape[0]):
+            a = anxiety0[n]
+            s = stress0[n]
+            out[n, 0, 0] = a
+            out[n, 0, 1] = s
+            row = n if codes.shape[0] > 1 else 0
+            for i in range(codes.shape[1]):
+                k_a = k_table[codes[row, i]] * responsiveness[n]
+                k_s = k_a * ratio
+                anxiety_reduction = k_a * a * (1 - 0.1 * s/10)
+                stress_reduction = k_s * s * (1 + 0.05 * a/10)
+                a_new = max(a - anxiety_reduction * dt, 0.5)
+                s_new = max(s - stress_reduction * dt - 0.08 * anxiety_reduction, 0.5)
+                # np.round(x, 2) is exactly rint(x * 100) / 100
+                a = np.rint(a_new * 100.0) / 100.0
+                s = np.rint(s_new * 100.0) / 100.0
+                out[n, i + 1, 0] = a
+                out[n, i + 1, 1] = s
+
+    @numba.njit(nogil=True, cache=True)
+    def rk4_trajectory(anxiety0, stress0, responsiveness, codes, k_table, ratio, dt, out):
+        half = 0.5 * dt
+        for n in range(out.shape[0]):
+            a = anxiety0[n]
+            s = stress0[n]
+            out[n, 0, 0] = a
+            out[n, 0, 1] = s
+            row = n if codes.shape[0] > 1 else 0
+            for i in range(codes.shape[1]):
+                k_a = k_table[codes[row, i]] * responsiveness[n]
+                k_s = k_a * ratio
+                k1a = -k_a * a * (1 - 0.15 * s/10)
+                k1s = -k_s * s * (1 + 0.08 * a/10)
+                a2 = a + half * k1a
+                s2 = s + half * k1s
+                k2a = -k_a * a2 * (1 - 0.15 * s2/10)
+                k2s = -k_s * s2 * (1 + 0.08 * a2/10)
+                a3 = a + half * k2a
+                s3 = s + half * k2s
+                k3a = -k_a * a3 * (1 - 0.15 * s3/10)
+                k3s = -k_s * s3 * (1 + 0.08 * a3/10)
+                a4 = a + dt * k3a
+                s4 = s + dt * k3s
+                k4a = -k_a * a4 * (1 - 0.15 * s4/10)
+                k4s = -k_s * s4 * (1 + 0.08 * a4/10)
+                a_new = max(a + (dt / 6.0) * (k1a + 2*k2a + 2*k3a + k4a), 0.5)
+                s_new = max(s + (dt / 6.0) * (k1s + 2*k2s + 2*k3s + k4s), 0.5)
+                a = np.rint(a_new * 100.0) / 100.0
+                s = np.rint(s_new * 100.0) / 100.0
+                out[n, i + 1, 0] = a
+                out[n, i + 1, 1] = s
+
+    _COMPILED_KERNELS.update({"Euler": euler_trajectory, "RK4": rk4_trajectory})
+    return _COMPILED_KERNELS
+
+# -------------------------------
+# 🧠 Step Memoization
+# -------------------------------
+
+class StepCache:
+    """Bounded LRU memo of Euler/RK4 steps keyed on quantized inputs
+
+    Both fixed-step methods round their outputs to 0.01 and responsiveness
+    is stored with 2 decimals, so large cohorts keep hitting the same
+    (anxiety, stress, category, responsiveness, dt) inputs. Keys use the
+    inputs rounded to 0.01: on-grid inputs (everything the engines produce
+    from a 2-decimal dataset) get exactly the uncached result.
+    """
+    # Ranges of the fields packed into one integer key
+    _SCORE_LIMIT = 1 << 20
+    _CODE_LIMIT = 1 << 4
+    _RESP_LIMIT = 1 << 12
+
+    def __init__(self, maxsize=1_000_000):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
+
+    @staticmethod
+    def _pack(anxiety, stress, codes, responsiveness):
+        """Quantize to the 0.01 grid and pack into int64 keys (+ validity mask)"""
+        qa = np.rint(np.asarray(anxiety) * 100).astype(np.int64)
+        qs = np.rint(np.asarray(stress) * 100).astype(np.int64)
+        qr = np.rint(np.asarray(responsiveness) * 100).astype(np.int64)
+        codes = np.asarray(codes, dtype=np.int64)
+        valid = ((qa >= 0) & (qa < StepCache._SCORE_LIMIT) & (qs >= 0) & (qs < StepCache._SCORE_LIMIT)
+                 & (qr >= 0) & (qr < StepCache._RESP_LIMIT) & (codes >= 0) & (codes < StepCache._CODE_LIMIT))
+        packed = ((qa * StepCache._SCORE_LIMIT + qs) * StepCache._CODE_LIMIT + codes) * StepCache._RESP_LIMIT + qr
+        return packed, valid
+
+    def _store(self, key, value):
+        """Insert and evict least recently used entries beyond maxsize"""
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def step(self, method, anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7):
+        """Cached euler_method / rk4_method for one person"""
+        step_fn = WellnessModel.euler_method if method == "Euler" else WellnessModel.rk4_method
+        code = TechniqueRegistry.encode(technique_type)
+        packed, valid = StepCache._pack(anxiety, stress, code, responsiveness)
+        if not valid:
+            return step_fn(anxiety, stress, code, dt, responsiveness)
+
+        key = (method, dt, int(packed))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = step_fn(anxiety, stress, code, dt, responsiveness)
+        self._store(key, entry)
+        return entry
+
+    def step_batch(self, method, anxiety, stress, technique_type="Physical", dt=1, responsiveness=0.7):
+        """Cached euler_batch / rk4_batch: only distinct uncached inputs are computed"""
+        step_fn = WellnessModel.euler_batch if method == "Euler" else WellnessModel.rk4_batch
+        codes = np.asarray(TechniqueRegistry.encode(technique_type))
+        shape = np.broadcast_shapes(np.shape(anxiety), np.shape(stress), codes.shape,
+                                    np.shape(responsiveness))
+        a = np.broadcast_to(np.asarray(anxiety, dtype=float), shape).reshape(-1)
+        s = np.broadcast_to(np.asarray(stress, dtype=float), shape).reshape(-1)
+        c = np.broadcast_to(codes, shape).reshape(-1)
+        r = np.broadcast_to(np.asarray(responsiveness, dtype=float), shape).reshape(-1)
+
+        anxiety_new = np.empty(len(a))
+        stress_new = np.empty(len(a))
+        packed, valid = StepCache._pack(a, s, c, r)
+        if not valid.all():
+            off_grid = ~valid
+            anxiety_new[off_grid], stress_new[off_grid] = step_fn(
+                a[off_grid], s[off_grid], c[off_grid], dt, r[off_grid])
+
+        rows = np.flatnonzero(valid)
+        keys, first, inverse = np.unique(packed[rows], return_index=True, return_inverse=True)
+        values = np.empty((len(keys), 2))
+        missing = []
+        entries = self._entries
+        for j, key in enumerate(keys.tolist()):
+            entry = entries.get((method, dt, key))
+            if entry is None:
+                missing.append(j)
+            else:
+                entries.move_to_end((method, dt, key))
+                values[j] = entry
+
+        if missing:
+            source = rows[first[missing]]
+            computed = np.column_stack(step_fn(a[source], s[source], c[source], dt, r[source]))
+            values[missing] = computed
+            for j, (new_a, new_s) in zip(missing, computed.tolist()):
+                self._store((method, dt, int(keys[j])), (new_a, new_s))
+
+        self.misses += len(missing)
+        self.hits += len(rows) - len(missing)
+        anxiety_new[rows] = values[inverse.reshape(-1), 0]
+        stress_new[rows] = values[inverse.reshape(-1), 1]
+        return anxiety_new.reshape(shape), stress_new.reshape(shape)
+
+# -------------------------------
+# 🧭 Schedule Optimization
+# -------------------------------
+
+class ScheduleOptimizer:
+    """Per-person category sequences that minimize final anxiety + stress
+
+    Beam search over the batched Euler/RK4 steps: every step expands each
+    kept sequence by all categories and keeps the beam_width lowest
+    anxiety + stress states per person. The fixed-step engines round
+    states to 0.01, so sequences reaching the same state are merged
+    and the beam only holds distinct states. Cost grows linearly with
+    steps (steps x beam_width x 6 evaluations per person) instead of 6^steps.
+    """
+    # Person x beam x category evaluations per block, to bound memory
+    BLOCK_EVALUATIONS = 2_000_000
+
+    @staticmethod
+    def search(anxiety, stress, steps, method="RK4", responsiveness=0.7, beam_width=8, dt=1):
+        """Best schedules for a population
+
+        Returns (codes, final): codes is (N, steps) int8 TechniqueRegistry
+        codes and final the (N, 2) state they lead to. Scalar inputs give
+        a (steps,) code array and a (2,) state.
+        """
+        scalar_input = np.ndim(anxiety) == 0 and np.ndim(stress) == 0
+        anxiety = np.atleast_1d(np.asarray(anxiety, dtype=float))
+        stress = np.atleast_1d(np.asarray(stress, dtype=float))
+        n = len(anxiety)
+        responsiveness = np.broadcast_to(np.asarray(responsiveness, dtype=float), (n,))
+
+        codes = np.empty((n, steps), dtype=np.int8)
+        final = np.empty((n, 2))
+        block = max(1, ScheduleOptimizer.BLOCK_EVALUATIONS
+                    // (beam_width * len(TechniqueRegistry.CATEGORIES)))
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            codes[start:stop], final[start:stop] = ScheduleOptimizer._search_block(
+                anxiety[start:stop], stress[start:stop], responsiveness[start:stop],
+                steps, method, beam_width, dt)
+        if scalar_input:
+            return codes[0], final[0]
+        return codes, final
+
+    @staticmethod
+    def _search_block(anxiety, stress, responsiveness, steps, method, beam_width, dt):
+        """Beam search for one block of people"""
+        step_fn = {"EULER": WellnessModel.euler_batch, "RK4": WellnessModel.rk4_batch}[method.upper()]
+        n = len(anxiety)
+        n_categories = len(TechniqueRegistry.CATEGORIES)
+        categories = np.arange(n_categories, dtype=np.int8)
+
+        # Beam state per person: (n, beams) scores, history of codes and a validity mask
+        beam_a = anxiety[:, None]
+        beam_s = stress[:, None]
+        history = np.empty((n, 1, 0), dtype=np.int8)
+        valid = np.ones((n, 1), dtype=bool)
+        rows = np.arange(n)[:, None]
+
+        for _ in range(steps):
+            beams = beam_a.shape[1]
+            # Expand every beam by every category: (n, beams, categories)
+            shape = (n, beams, n_categories)
+            cand_a, cand_s = step_fn(
+                np.broadcast_to(beam_a[:, :, None], shape).ravel(),
+                np.broadcast_to(beam_s[:, :, None], shape).ravel(),
+                np.broadcast_to(categories, shape).ravel(),
+                dt=dt,
+                responsiveness=np.broadcast_to(responsiveness[:, None, None], shape).ravel())
+            cand_a = cand_a.reshape(n, -1)
+            cand_s = cand_s.reshape(n, -1)
+
+            # Sort by (anxiety + stress, anxiety, stress) on the 0.01 grid;
+            # equal keys are the same state, so only the first one is kept
+            qa = np.rint(cand_a * 100).astype(np.int64)
+            qs = np.rint(cand_s * 100).astype(np.int64)
+            key = ((qa + qs) << 42) | (qa << 21) | qs
+            key[~np.repeat(valid, n_categories, axis=1)] = np.iinfo(np.int64).max
+            order = np.argsort(key, axis=1, kind='stable')
+            ranked = np.take_along_axis(key, order, axis=1)
+            duplicate = np.zeros_like(ranked, dtype=bool)
+            duplicate[:, 1:] = ranked[:, 1:] == ranked[:, :-1]
+            # Push duplicates behind every distinct state, keeping their order
+            distinct_first = np.argsort(duplicate, axis=1, kind='stable')[:, :beam_width]
+            keep = np.take_along_axis(order, distinct_first, axis=1)
+            valid = ((np.take_along_axis(ranked, distinct_first, axis=1) != np.iinfo(np.int64).max)
+                     & ~np.take_along_axis(duplicate, distinct_first, axis=1))
+
+            parent, category = np.divmod(keep, n_categories)
+            history = np.concatenate([history[rows, parent], category[:, :, None].astype(np.int8)],
+                                     axis=2)
+            beam_a = np.take_along_axis(cand_a, keep, axis=1)
+            beam_s = np.take_along_axis(cand_s, keep, axis=1)
+
+        # Beams are sorted, so the first one is the best
+        return history[:, 0], np.column_stack((beam_a[:, 0], beam_s[:, 0]))
+
+    @staticmethod
+    def plans(data, steps, method="RK4", beam_width=8):
+        """One row per person: the best category per step and where it leads"""
+        import pandas as pd
+
+        codes, final = ScheduleOptimizer.search(
+            BatchSimulator._column(data, 'Initial_Anxiety'),
+            BatchSimulator._column(data, 'Initial_Stress'),
+            steps, method, BatchSimulator._column(data, 'Responsiveness'), beam_width)
+        names = TechniqueRegistry.decode(codes)
+        frame = pd.DataFrame({'PersonID': data['PersonID'].to_numpy()})
+        for i in range(steps):
+            frame[f'Step_{i + 1}'] = names[:, i]
+        frame['Final_Anxiety'] = final[:, 0]
+        frame['Final_Stress'] = final[:, 1]
+        return frame
+
 # -------------------------------
 # 📊 Enhanced Visualization Functions (Simplified)
 # -------------------------------
@@ -383,82 +1288,114 @@ class Visualizations:
     """Premium visualization functions"""
     
     @staticmethod
-    def plot_wellness_journey(steps, euler_data, rk4_data, techniques):
-        """Create a beautiful wellness journey visualization"""
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        
-        x = range(steps + 1)
+    def plot_wellness_journey(steps, euler_data, rk4_data, techniques, path=None):
+        """Create a beautiful wellness journey visualization (saved to path if given)"""
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(14, 6))
+        journey = Visualizations.journey_template(fig, steps)
+        Visualizations.update_journey(journey, euler_data, rk4_data, techniques)
+        plt.tight_layout()
+        if path is None:
+            plt.show()
+        else:
+            fig.savefig(path)
+            plt.close(fig)
+    
+    @staticmethod
+    def journey_template(fig, steps):
+        """Lay out the journey figure once; returns the artists update_journey changes"""
+        ax1, ax2 = fig.subplots(1, 2)
+        x = np.arange(steps + 1)
+        blank = np.zeros(steps + 1)
         
         # Anxiety plot
-        ax1.plot(x, euler_data['anxiety'], 'o-', label='Euler Anxiety', linewidth=3, markersize=8,
-                color='#FF6B6B', alpha=0.8, markerfacecolor='white')
-        ax1.plot(x, rk4_data['anxiety'], 's-', label='RK4 Anxiety', linewidth=3, markersize=8,
-                color='#4ECDC4', alpha=0.8, markerfacecolor='white')
+        euler_anxiety, = ax1.plot(x, blank, 'o-', label='Euler Anxiety', linewidth=3, markersize=8,
+                                  color='#FF6B6B', alpha=0.8, markerfacecolor='white')
+        rk4_anxiety, = ax1.plot(x, blank, 's-', label='RK4 Anxiety', linewidth=3, markersize=8,
+                                color='#4ECDC4', alpha=0.8, markerfacecolor='white')
         ax1.set_xlabel('Relaxation Steps', fontsize=12, fontweight='bold')
         ax1.set_ylabel('Anxiety Level', fontsize=12, fontweight='bold')
         ax1.set_title('Anxiety Reduction Progress', fontsize=14, fontweight='bold')
         ax1.grid(True, alpha=0.2, linestyle='--')
         ax1.legend()
         
-        # Add technique labels
-        for i, tech in enumerate(techniques):
-            if i < steps:
-                ax1.annotate(f'Step {i+1}: {tech[:15]}...',
-                            xy=(i+1, (euler_data['anxiety'][i+1] + rk4_data['anxiety'][i+1])/2),
-                           xytext=(i+1, max(euler_data['anxiety'][i+1], rk4_data['anxiety'][i+1]) + 0.3),
-                           ha='center', fontsize=8, alpha=0.7,
-                           arrowprops=dict(arrowstyle='->', alpha=0.5))
+        # Technique labels, one per step
+        annotations = [ax1.annotate('', xy=(i + 1, 0), xytext=(i + 1, 0), ha='center', fontsize=8,
+                                    alpha=0.7, arrowprops=dict(arrowstyle='->', alpha=0.5))
+                       for i in range(steps)]
         
         # Stress plot
-        ax2.plot(x, euler_data['stress'], '^-', label='Euler Stress', linewidth=3, markersize=8,
-                color='#FFA726', alpha=0.8, markerfacecolor='white')
-        ax2.plot(x, rk4_data['stress'], 'v-', label='RK4 Stress', linewidth=3, markersize=8,
-                color='#26C6DA', alpha=0.8, markerfacecolor='white')
+        euler_stress, = ax2.plot(x, blank, '^-', label='Euler Stress', linewidth=3, markersize=8,
+                                 color='#FFA726', alpha=0.8, markerfacecolor='white')
+        rk4_stress, = ax2.plot(x, blank, 'v-', label='RK4 Stress', linewidth=3, markersize=8,
+                               color='#26C6DA', alpha=0.8, markerfacecolor='white')
         ax2.set_xlabel('Relaxation Steps', fontsize=12, fontweight='bold')
         ax2.set_ylabel('Stress Level', fontsize=12, fontweight='bold')
         ax2.set_title('Stress Reduction Progress', fontsize=14, fontweight='bold')
         ax2.grid(True, alpha=0.2, linestyle='--')
         ax2.legend()
         
-        plt.suptitle('Wellness Journey Analysis', fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.show()
+        fig.suptitle('Wellness Journey Analysis', fontsize=16, fontweight='bold')
+        return {
+            'axes': (ax1, ax2),
+            'lines': (euler_anxiety, rk4_anxiety, euler_stress, rk4_stress),
+            'annotations': annotations
+        }
+    
+    @staticmethod
+    def update_journey(journey, euler_data, rk4_data, techniques):
+        """Draw one person's trajectories into a journey_template"""
+        euler_anxiety, rk4_anxiety, euler_stress, rk4_stress = journey['lines']
+        euler_anxiety.set_ydata(euler_data['anxiety'])
+        rk4_anxiety.set_ydata(rk4_data['anxiety'])
+        euler_stress.set_ydata(euler_data['stress'])
+        rk4_stress.set_ydata(rk4_data['stress'])
+        
+        for i, (annotation, tech) in enumerate(zip(journey['annotations'], techniques)):
+            euler_value, rk4_value = euler_data['anxiety'][i + 1], rk4_data['anxiety'][i + 1]
+            annotation.set_text(f'Step {i+1}: {tech[:15]}...')
+            annotation.xy = (i + 1, (euler_value + rk4_value) / 2)
+            annotation.set_position((i + 1, max(euler_value, rk4_value) + 0.3))
+        
+        for ax in journey['axes']:
+            ax.relim()
+            ax.autoscale_view()
     
     @staticmethod
     def create_report_card(person_id, initial, final, improvements, steps, best_method):
         """Create a SIMPLE premium report card"""
+        import matplotlib.pyplot as plt
         fig = plt.figure(figsize=(12, 8))
-        
+        card = Visualizations.report_card_template(fig)
+        Visualizations.update_report_card(card, person_id, initial, final, improvements,
+                                          steps, best_method)
+        plt.tight_layout()
+        plt.show()
+    
+    @staticmethod
+    def report_card_template(fig):
+        """Lay out the report card once; returns the artists update_report_card changes"""
         # Create grid
         gs = fig.add_gridspec(2, 2, hspace=0.3, wspace=0.3)
         
         # 1. Bar chart - Improvements
         ax1 = fig.add_subplot(gs[0, 0])
         categories = ['Anxiety', 'Stress', 'Total']
-        anxiety_imp, stress_imp = improvements
-        values = [anxiety_imp, stress_imp, anxiety_imp + stress_imp]
         colors = ['#FF6B6B', '#4ECDC4', '#8E44AD']
         
-        bars = ax1.bar(categories, values, color=colors, edgecolor='black', linewidth=2)
+        bars = ax1.bar(categories, [0, 0, 0], color=colors, edgecolor='black', linewidth=2)
         ax1.set_ylabel('Improvement (points)', fontsize=11, fontweight='bold')
         ax1.set_title('Improvement Summary', fontsize=13, fontweight='bold')
         ax1.grid(True, alpha=0.3, axis='y')
-        
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height + 0.07,
-                    f'{value:.2f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+        bar_labels = [ax1.text(bar.get_x() + bar.get_width()/2., 0, '', ha='center', va='bottom',
+                               fontsize=10, fontweight='bold') for bar in bars]
         
         # 2. Donut chart - Initial vs Final
         ax2 = fig.add_subplot(gs[0, 1])
-        initial_total = initial[0] + initial[1]
-        final_total = final[0] + final[1]
-        
-        sizes = [initial_total, final_total]
         labels = ['Initial\nTotal Score', 'Final\nTotal Score']
         colors_donut = ['#E74C3C', '#2ECC71']
         
-        wedges, texts, autotexts = ax2.pie(sizes, labels=labels, colors=colors_donut, autopct='%1.1f%%',
+        wedges, texts, autotexts = ax2.pie([1, 1], labels=labels, colors=colors_donut, autopct='%1.1f%%',
                startangle=90, wedgeprops=dict(width=0.4, edgecolor='black'))
         
         for autotext in autotexts:
@@ -474,17 +1411,12 @@ class Visualizations:
         
         # 3. Progress comparison
         ax3 = fig.add_subplot(gs[1, 0])
-        progress_data = {
-            'Initial': [initial[0], initial[1]],
-            'Final': [final[0], final[1]]
-        }
-        
         x = np.arange(2)
         width = 0.35
         
-        bars1 = ax3.bar(x - width/2, progress_data['Initial'], width, label='Initial',
+        bars1 = ax3.bar(x - width/2, [0, 0], width, label='Initial',
                        color=['#E74C3C', '#3498DB'], edgecolor='black')
-        bars2 = ax3.bar(x + width/2, progress_data['Final'], width, label='Final',
+        bars2 = ax3.bar(x + width/2, [0, 0], width, label='Final',
                        color=['#FF6B6B', '#4ECDC4'], edgecolor='black')
         
         ax3.set_xlabel('Metrics', fontweight='bold')
@@ -494,37 +1426,67 @@ class Visualizations:
         ax3.set_xticklabels(['Anxiety', 'Stress'])
         ax3.legend()
         ax3.grid(True, alpha=0.3, axis='y')
-        
-        # Add value labels
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax3.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'{height:.1f}', ha='center', va='bottom', fontsize=9, fontweight='bold')
+        progress_labels = [ax3.text(bar.get_x() + bar.get_width()/2., 0, '', ha='center', va='bottom',
+                                    fontsize=9, fontweight='bold') for bar in [*bars1, *bars2]]
         
         # 4. Status indicators
         ax4 = fig.add_subplot(gs[1, 1])
         ax4.axis('off')
+        status = ax4.text(0.1, 0.5, '', fontsize=11, va='center', fontweight='bold',
+                          bbox=dict(boxstyle='round', facecolor='#F8F9F9', alpha=0.9,
+                                    edgecolor='black', linewidth=3))
+        
+        title = fig.suptitle('', fontsize=16, fontweight='bold', y=0.98)
+        return {
+            'bar_axes': (ax1, ax3),
+            'bars': list(zip(bars, bar_labels)),
+            'donut': list(zip(wedges, texts, autotexts)),
+            'progress': list(zip([*bars1, *bars2], progress_labels)),
+            'status': status,
+            'title': title
+        }
+    
+    @staticmethod
+    def update_report_card(card, person_id, initial, final, improvements, steps, best_method):
+        """Draw one person's results into a report_card_template"""
+        anxiety_imp, stress_imp = improvements
+        for (bar, label), value in zip(card['bars'], [anxiety_imp, stress_imp, anxiety_imp + stress_imp]):
+            bar.set_height(value)
+            label.set_y(value + 0.07)
+            label.set_text(f'{value:.2f}')
+        
+        # Donut wedges, placed the way Axes.pie does (counterclockwise from 90°)
+        sizes = np.array([initial[0] + initial[1], final[0] + final[1]], dtype=float)
+        theta1 = 90.0
+        for (wedge, text, autotext), fraction in zip(card['donut'], sizes / sizes.sum()):
+            theta2 = theta1 + 360 * fraction
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            middle = np.deg2rad((theta1 + theta2) / 2)
+            text.set_position((1.1 * np.cos(middle), 1.1 * np.sin(middle)))
+            text.set_horizontalalignment('left' if np.cos(middle) > 0 else 'right')
+            autotext.set_position((0.6 * np.cos(middle), 0.6 * np.sin(middle)))
+            autotext.set_text(f'{100 * fraction:.1f}%')
+            theta1 = theta2
+        
+        for (bar, label), value in zip(card['progress'], [initial[0], initial[1], final[0], final[1]]):
+            bar.set_height(value)
+            label.set_y(value + 0.1)
+            label.set_text(f'{value:.1f}')
+        
+        for ax in card['bar_axes']:
+            ax.relim()
+            ax.autoscale_view()
         
         # Calculate final status
         final_avg = (final[0] + final[1]) / 2
         
-        if final_avg >= 8:
-            status = "⚡ SEVERE"
-            status_color = "#E74C3C"
-            recommendation = "Urgent intervention needed"
-        elif final_avg >= 6:
-            status = "⚠️  HIGH"
-            status_color = "#F39C12"
-            recommendation = "Continue intensive program"
-        elif final_avg >= 4:
-            status = "📊 MODERATE"
-            status_color = "#3498DB"
-            recommendation = "Maintain current routine"
-        else:
-            status = "🌿 MILD"
-            status_color = "#2ECC71"
-            recommendation = "Wellness level good"
+        status, status_color, recommendation = (
+            ("🌿 MILD", "#2ECC71", "Wellness level good"),
+            ("📊 MODERATE", "#3498DB", "Maintain current routine"),
+            ("⚠️  HIGH", "#F39C12", "Continue intensive program"),
+            ("⚡ SEVERE", "#E74C3C", "Urgent intervention needed")
+        )[SeverityClassifier.level(final_avg)]
         
         status_text = f"""
         ┌──────────────────────────┐
@@ -541,17 +1503,14 @@ class Visualizations:
         Steps Completed: {steps}
         """
         
-        ax4.text(0.1, 0.5, status_text, fontsize=11, va='center', fontweight='bold',
-                bbox=dict(boxstyle='round', facecolor='#F8F9F9', alpha=0.9, edgecolor=status_color, linewidth=3))
-        
-        plt.suptitle(f'Premium Wellness Report - Person {person_id}', 
-                     fontsize=16, fontweight='bold', y=0.98)
-        plt.tight_layout()
-        plt.show()
+        card['status'].set_text(status_text)
+        card['status'].get_bbox_patch().set_edgecolor(status_color)
+        card['title'].set_text(f'Premium Wellness Report - Person {person_id}')
     
     @staticmethod
     def method_comparison_chart(euler_improvements, rk4_improvements):
         """Create method comparison chart"""
+        import matplotlib.pyplot as plt
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
         
         # Bar chart comparison
@@ -598,6 +1557,505 @@ class Visualizations:
         plt.tight_layout()
         plt.show()
 
+    @staticmethod
+    def plot_cohort_density(densities, path=None, percentiles=(5, 25, 50, 75, 95)):
+        """Density image plus percentile bands for each method's cohort
+
+        densities maps method name to CohortDensity. The figure is shown
+        with pyplot, or written to path without touching pyplot.
+        """
+        from matplotlib.colors import LogNorm
+        if path is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(14, 5 * len(densities)))
+        else:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=(14, 5 * len(densities)))
+            FigureCanvasAgg(fig)
+        axes = fig.subplots(len(densities), 2, squeeze=False)
+        
+        median = list(percentiles).index(50) if 50 in percentiles else None
+        for row, (name, density) in enumerate(densities.items()):
+            bands = density.percentiles(percentiles)
+            step_edges = np.arange(density.steps + 2) - 0.5
+            x = np.arange(density.steps + 1)
+            for col, (score, color) in enumerate([('Anxiety', '#FF6B6B'), ('Stress', '#4ECDC4')]):
+                ax = axes[row, col]
+                counts = np.ma.masked_equal(density.counts[:, col].T, 0)
+                image = ax.pcolormesh(step_edges, density.edges, counts, cmap='Greys',
+                                      norm=LogNorm(vmin=1, vmax=max(1, counts.max())), shading='flat')
+                fig.colorbar(image, ax=ax, label='Persons')
+                
+                # Outer bands as a filled range, inner ones as dashed lines
+                ax.fill_between(x, bands[0, :, col], bands[-1, :, col], color=color, alpha=0.15,
+                                label=f'P{percentiles[0]}-P{percentiles[-1]}')
+                for i, percent in enumerate(percentiles):
+                    if i == median:
+                        ax.plot(x, bands[i, :, col], 'o-', color=color, linewidth=3,
+                                markerfacecolor='white', label='Median')
+                    elif 0 < i < len(percentiles) - 1:
+                        ax.plot(x, bands[i, :, col], '--', color=color, linewidth=1.5, alpha=0.9)
+                
+                ax.set_xlabel('Relaxation Steps', fontsize=12, fontweight='bold')
+                ax.set_ylabel(f'{score} Level', fontsize=12, fontweight='bold')
+                ax.set_title(f'{name} Method - {score}', fontsize=14, fontweight='bold')
+                ax.set_xticks(x)
+                ax.legend(loc='upper right')
+        
+        n_persons = len(next(iter(densities.values())))
+        fig.suptitle(f'Cohort Wellness Trajectories ({n_persons:,} persons)', fontsize=16, fontweight='bold')
+        fig.tight_layout()
+        if path is None:
+            plt.show()
+        else:
+            fig.savefig(path)
+    
+    @staticmethod
+    def plot_store_journey(store, index, path=None):
+        """Wellness journey of one person read straight from a TrajectoryStore"""
+        if not {'Euler', 'RK4'} <= set(store.methods):
+            raise ValueError("The journey plot needs both Euler and RK4 trajectories")
+        # Only this person's (steps+1, 2) slices are read from disk
+        euler = np.array(store.method('Euler')[index])
+        rk4 = np.array(store.method('RK4')[index])
+        Visualizations.plot_wellness_journey(
+            store.steps,
+            {'anxiety': euler[:, 0], 'stress': euler[:, 1]},
+            {'anxiety': rk4[:, 0], 'stress': rk4[:, 1]},
+            [technique for _, technique in store.schedule],
+            path
+        )
+
+class ReportRenderer:
+    """Headless renderer that redraws reusable report/journey figures per person
+
+    The figures are laid out once (Agg canvas, no pyplot) and only their
+    data artists change between people; the layout is fixed after the
+    first person is drawn.
+    """
+    KINDS = ("report", "journey")
+    FORMATS = ("png", "pdf")
+    # Renderers kept per worker process, keyed on their settings
+    _shared = {}
+
+    def __init__(self, steps, techniques, kinds=KINDS, fmt="png", dpi=100):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        if fmt not in ReportRenderer.FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {ReportRenderer.FORMATS}")
+        self.steps = steps
+        self.techniques = list(techniques)
+        self.fmt = fmt
+        self.dpi = dpi
+        self.templates = {}
+        self._laid_out = set()
+        for kind in kinds:
+            if kind == "report":
+                fig = Figure(figsize=(12, 8))
+                FigureCanvasAgg(fig)
+                self.templates[kind] = (fig, Visualizations.report_card_template(fig))
+            elif kind == "journey":
+                fig = Figure(figsize=(14, 6))
+                FigureCanvasAgg(fig)
+                self.templates[kind] = (fig, Visualizations.journey_template(fig, steps))
+            else:
+                raise ValueError(f"Unknown figure {kind!r}; expected one of {ReportRenderer.KINDS}")
+
+    @staticmethod
+    def shared(steps, techniques, kinds=KINDS, fmt="png", dpi=100):
+        """Renderer reused by every task a worker process handles"""
+        key = (steps, tuple(techniques), tuple(kinds), fmt, dpi)
+        if key not in ReportRenderer._shared:
+            ReportRenderer._shared[key] = ReportRenderer(steps, techniques, kinds, fmt, dpi)
+        return ReportRenderer._shared[key]
+
+    def render(self, out_dir, person_id, euler, rk4):
+        """Write the figures of one person from their (steps+1, 2) trajectories"""
+        initial = (euler[0, 0], euler[0, 1])
+        improvements_euler = (initial[0] - euler[-1, 0], initial[1] - euler[-1, 1])
+        improvements_rk4 = (initial[0] - rk4[-1, 0], initial[1] - rk4[-1, 1])
+        paths = []
+        for kind, (fig, artists) in self.templates.items():
+            if kind == "report":
+                # Same rule as analyze_person: RK4 only wins on a strictly larger reduction
+                if sum(improvements_rk4) > sum(improvements_euler):
+                    final, improvements, best = tuple(rk4[-1]), improvements_rk4, "RK4 Method"
+                else:
+                    final, improvements, best = tuple(euler[-1]), improvements_euler, "Euler Method"
+                Visualizations.update_report_card(artists, person_id, initial, final, improvements,
+                                                  self.steps, best)
+            else:
+                Visualizations.update_journey(artists, {'anxiety': euler[:, 0], 'stress': euler[:, 1]},
+                                              {'anxiety': rk4[:, 0], 'stress': rk4[:, 1]},
+                                              self.techniques)
+            if kind not in self._laid_out:
+                fig.tight_layout()
+                # Keep the computed layout; any engine left set makes savefig draw twice
+                fig.set_layout_engine(None)
+                self._laid_out.add(kind)
+            path = os.path.join(out_dir, f"person_{person_id}_{kind}.{self.fmt}")
+            fig.savefig(path, format=self.fmt, dpi=self.dpi)
+            paths.append(path)
+        return paths
+
+# -------------------------------
+# 📐 Streaming Statistics
+# -------------------------------
+
+class RunningStats:
+    """Single-pass, mergeable statistics of paired anxiety/stress samples
+
+    Samples run along the first axis; any further axes (e.g. the steps of
+    simulated trajectories) are tracked independently, so mean etc. have
+    shape (..., 2) with anxiety and stress in the last axis. Each chunk is
+    reduced with two passes in float64 and folded in with Chan et al.'s
+    pairwise update, which is also how partial states from different
+    workers are merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.m2 = None          # Sum of squared deviations per score
+        self.comoment = None    # Sum of (anxiety - mean) * (stress - mean)
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def of(anxiety, stress):
+        """Statistics of one chunk (worker entry point)"""
+        stats = RunningStats()
+        stats.update(anxiety, stress)
+        return stats
+
+    def update(self, anxiety, stress):
+        """Add a chunk of samples; returns self"""
+        pairs = np.stack([np.asarray(anxiety, dtype=np.float64),
+                          np.asarray(stress, dtype=np.float64)], axis=-1)
+        if len(pairs) == 0:
+            return self
+        chunk = RunningStats()
+        chunk.count = len(pairs)
+        chunk.mean = pairs.mean(axis=0)
+        deviations = pairs - chunk.mean
+        chunk.m2 = np.einsum('i...,i...->...', deviations, deviations)
+        chunk.comoment = np.einsum('i...,i...->...', deviations[..., 0], deviations[..., 1])
+        chunk.min = pairs.min(axis=0)
+        chunk.max = pairs.max(axis=0)
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Fold another RunningStats (same trailing shape) into this one; returns self"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.mean, self.m2, self.comoment = other.mean.copy(), other.m2.copy(), other.comoment.copy()
+            self.min, self.max = other.min.copy(), other.max.copy()
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        weight = self.count * other.count / count
+        self.comoment = self.comoment + other.comoment + delta[..., 0] * delta[..., 1] * weight
+        self.m2 = self.m2 + other.m2 + delta * delta * weight
+        self.mean = self.mean + delta * (other.count / count)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = count
+        return self
+
+    def variance(self, ddof=1):
+        """Variance per score (ddof=1 like pandas)"""
+        return self.m2 / (self.count - ddof) if self.count > ddof else np.full_like(self.m2, np.nan)
+
+    def std(self, ddof=1):
+        """Standard deviation per score (ddof=1 like pandas)"""
+        return np.sqrt(self.variance(ddof))
+
+    def correlation(self):
+        """Pearson correlation between anxiety and stress"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.comoment / np.sqrt(self.m2[..., 0] * self.m2[..., 1])
+
+class CohortDensity:
+    """(step x score) histograms of many trajectories, accumulated chunk by chunk
+
+    counts has shape (steps+1, 2, bins) for anxiety and stress. Percentile
+    bands are read off the cumulative counts, so they are exact to within
+    one bin and cost nothing extra per person.
+    """
+    # Persons binned per pass, to bound the temporary index arrays
+    BLOCK = 65_536
+
+    def __init__(self, steps, bins=105, score_range=(0.0, 10.5)):
+        self.steps = steps
+        self.bins = bins
+        self.low, self.high = score_range
+        self.edges = np.linspace(self.low, self.high, bins + 1)
+        self.counts = np.zeros((steps + 1, 2, bins), dtype=np.int64)
+
+    def __len__(self):
+        return int(self.counts[0, 0].sum())
+
+    def update(self, trajectories):
+        """Bin (N, steps+1, 2) trajectories; returns self"""
+        scale = self.bins / (self.high - self.low)
+        # Flat offset of every (step, score) histogram row
+        rows = (np.arange((self.steps + 1) * 2) * self.bins).reshape(self.steps + 1, 2)
+        for start in range(0, len(trajectories), CohortDensity.BLOCK):
+            block = np.asarray(trajectories[start:start + CohortDensity.BLOCK], dtype=np.float64)
+            index = np.clip(((block - self.low) * scale).astype(np.int64), 0, self.bins - 1)
+            self.counts += np.bincount((index + rows).ravel(),
+                                       minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def merge(self, other):
+        """Add the counts of another CohortDensity with the same bins; returns self"""
+        self.counts += other.counts
+        return self
+
+    def percentiles(self, q=(5, 25, 50, 75, 95)):
+        """Percentile bands of shape (len(q), steps+1, 2), interpolated within bins"""
+        cumulative = np.cumsum(self.counts, axis=-1)
+        width = (self.high - self.low) / self.bins
+        bands = []
+        for percent in q:
+            target = cumulative[..., -1:] * (percent / 100)
+            index = np.minimum((cumulative < target).sum(axis=-1), self.bins - 1)
+            before = np.take_along_axis(cumulative, index[..., None], -1) - \
+                np.take_along_axis(self.counts, index[..., None], -1)
+            inside = np.take_along_axis(self.counts, index[..., None], -1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                fraction = np.clip(np.nan_to_num((target - before) / inside), 0, 1)
+            bands.append(self.low + (index + fraction[..., 0]) * width)
+        return np.array(bands)
+
+    @staticmethod
+    def from_results(results, bins=105):
+        """One CohortDensity per method of BatchSimulator.simulate results"""
+        return {name: CohortDensity(results['steps'], bins).update(results[name])
+                for name in results['methods']}
+
+    @staticmethod
+    def from_store(store, bins=105, chunk_size=100_000):
+        """One CohortDensity per method of a TrajectoryStore, read slice by slice"""
+        densities = {}
+        for name in store.methods:
+            density = CohortDensity(store.steps, bins)
+            trajectories = store.method(name)
+            for start in range(0, len(store), chunk_size):
+                density.update(trajectories[start:start + chunk_size])
+            densities[name] = density
+        return densities
+
+# -------------------------------
+# 🎲 Monte Carlo Ensembles
+# -------------------------------
+
+class ResponsivenessEnsemble:
+    """Uncertainty bands from K sampled responsiveness values per person
+
+    Each person's responsiveness r is treated as the mean of
+    Beta(r * concentration, (1 - r) * concentration); the default
+    concentration 5 matches the Beta(3, 2) the cohorts are drawn from.
+    With effectiveness_sd > 0 every sample also scales each category's
+    effectiveness by a mean-one lognormal factor. All N x K paths of a
+    block of people advance together, one batched step at a time, and
+    only the per-step percentiles and target probabilities are kept, so
+    memory depends on the block size, not on N x K. Block b draws from
+    child b of SeedSequence(seed), so results are reproducible.
+    """
+    # Paths (persons x samples) advanced together per block
+    BLOCK_PATHS = 2_000_000
+    STEP_FUNCTIONS = {"EULER": "euler_batch", "RK4": "rk4_batch", "IMPLICIT": "implicit_batch"}
+
+    def __init__(self, samples=1000, concentration=5.0, effectiveness_sd=0.0, seed=42,
+                 percentiles=(5, 50, 95), target=4.0):
+        self.samples = samples
+        self.concentration = concentration
+        self.effectiveness_sd = effectiveness_sd
+        self.seed = seed
+        self.percentiles = tuple(percentiles)
+        self.target = target
+
+    def _draw(self, block_index, responsiveness):
+        """(n*K,) responsiveness samples and (n*K, codes) effectiveness factors"""
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(block_index,)))
+        # Beta needs 0 < mean < 1; the dataset rounds to 0.01, so clip to that grid
+        mean = np.repeat(np.clip(responsiveness, 0.01, 0.99), self.samples)
+        sampled = rng.beta(mean * self.concentration, (1 - mean) * self.concentration)
+        factors = None
+        if self.effectiveness_sd > 0:
+            sd = self.effectiveness_sd
+            # One column per code, UNKNOWN included, so any encoded schedule can index it
+            factors = rng.lognormal(-0.5 * sd * sd, sd, (len(sampled), TechniqueRegistry.UNKNOWN + 1))
+        return sampled, factors
+
+    def run(self, anxiety, stress, schedule, responsiveness=0.7, method="RK4", dt=1):
+        """Ensemble statistics for a population
+
+        schedule is shared (length steps) or per person (N, steps) as in
+        WellnessModel.integrate. Returns a dict with 'percentiles' of shape
+        (len(percentiles), N, steps+1, 2), 'mean' (N, steps+1, 2) and
+        'p_target' (N, steps+1): the fraction of samples whose anxiety and
+        stress are both at or below target after each step.
+        """
+        step_fn = getattr(WellnessModel, ResponsivenessEnsemble.STEP_FUNCTIONS[method.upper()])
+        schedule = np.asarray(TechniqueRegistry.encode(schedule))
+        steps = schedule.shape[-1]
+        anxiety = np.atleast_1d(np.asarray(anxiety, dtype=float))
+        stress = np.atleast_1d(np.asarray(stress, dtype=float))
+        n = len(anxiety)
+        responsiveness = np.broadcast_to(np.asarray(responsiveness, dtype=float), (n,))
+
+        bands = np.empty((len(self.percentiles), n, steps + 1, 2))
+        mean = np.empty((n, steps + 1, 2))
+        p_target = np.empty((n, steps + 1))
+        block = max(1, ResponsivenessEnsemble.BLOCK_PATHS // self.samples)
+        for block_index, start in enumerate(range(0, n, block)):
+            stop = min(start + block, n)
+            sampled, factors = self._draw(block_index, responsiveness[start:stop])
+            a = np.repeat(anxiety[start:stop], self.samples)
+            s = np.repeat(stress[start:stop], self.samples)
+            rows = np.arange(len(a))
+            for i in range(steps + 1):
+                if i:
+                    codes = schedule[i - 1] if schedule.ndim == 1 else np.repeat(
+                        schedule[start:stop, i - 1], self.samples)
+                    effective = sampled if factors is None else sampled * factors[rows, codes]
+                    a, s = step_fn(a, s, codes, dt=dt, responsiveness=effective)
+                self._reduce(a, s, stop - start, i, bands[:, start:stop], mean[start:stop],
+                             p_target[start:stop])
+        return {'percentiles': bands, 'mean': mean, 'p_target': p_target,
+                'q': self.percentiles, 'target': self.target, 'samples': self.samples}
+
+    def _reduce(self, anxiety, stress, n, step, bands, mean, p_target):
+        """Fold the K samples of one step into the block's statistics"""
+        a = anxiety.reshape(n, self.samples)
+        s = stress.reshape(n, self.samples)
+        bands[:, :, step, 0] = np.percentile(a, self.percentiles, axis=1)
+        bands[:, :, step, 1] = np.percentile(s, self.percentiles, axis=1)
+        mean[:, step, 0] = a.mean(axis=1)
+        mean[:, step, 1] = s.mean(axis=1)
+        p_target[:, step] = np.mean((a <= self.target) & (s <= self.target), axis=1)
+
+    @staticmethod
+    def to_frame(person_ids, summary):
+        """One row per person and step with the bands and target probability"""
+        import pandas as pd
+
+        n, steps_1 = summary['p_target'].shape
+        frame = pd.DataFrame({'PersonID': np.repeat(np.asarray(person_ids), steps_1),
+                              'Step': np.tile(np.arange(steps_1), n)})
+        for j, label in enumerate(('Anxiety', 'Stress')):
+            frame[f'{label}_Mean'] = summary['mean'][..., j].ravel()
+            for q, band in zip(summary['q'], summary['percentiles']):
+                frame[f'{label}_P{q:g}'] = band[..., j].ravel()
+        frame['P_Target'] = summary['p_target'].ravel()
+        return frame
+
+# -------------------------------
+# 🌪️ Stochastic Dynamics
+# -------------------------------
+
+class StochasticSimulator:
+    """Noisy day-to-day paths of the coupled anxiety-stress model
+
+    dX = f(X) dt + sigma * X dW: the drift f is the RK4 model's coupled
+    ODEs and each score gets its own multiplicative noise (independent
+    Wiener processes). Every session is split into substeps of
+    Euler-Maruyama or Milstein (which adds 0.5 * sigma^2 * X * (dW^2 - h)
+    and converges with strong order 1 instead of 0.5). Scores are kept at
+    the model's 0.5 floor and are not rounded. With sigma = 0 both schemes
+    are plain first-order Euler on the substeps; they approach the RK45
+    solution only at first order as substeps grow, and never where the
+    floor is active (rk45_method is unclamped).
+
+    People are simulated in fixed blocks of BLOCK; block b draws all its
+    normals, one session at a time, from child b of SeedSequence(seed).
+    The paths are therefore identical whatever the number of workers.
+    """
+    SCHEMES = ("EulerMaruyama", "Milstein")
+    BLOCK = 65_536
+
+    def __init__(self, sigma=0.1, scheme="Milstein", substeps=16, seed=42):
+        if scheme not in StochasticSimulator.SCHEMES:
+            raise ValueError(f"Unknown scheme {scheme!r}; choose from {', '.join(StochasticSimulator.SCHEMES)}")
+        # One noise level per score: (anxiety, stress)
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (2,)).copy()
+        self.scheme = scheme
+        self.substeps = substeps
+        self.seed = seed
+
+    @staticmethod
+    def _session(y, k_a, k_s, dW, h, sigma, milstein):
+        """Advance (N, 2) states through one session of (substeps, N, 2) increments"""
+        for increment in dW:
+            drift = WellnessModel._coupled_rhs(y, k_a, k_s)
+            noise = sigma * y
+            y_new = y + drift * h + noise * increment
+            if milstein:
+                # g = sigma * x, so g * g' = sigma^2 * x
+                y_new += 0.5 * sigma * noise * (increment * increment - h)
+            y = np.maximum(y_new, 0.5)
+        return y
+
+    def _simulate_block(self, block_index, anxiety, stress, codes, responsiveness, dt):
+        """(n, steps+1, 2) paths of one block from its own seed stream"""
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(block_index,)))
+        n = len(anxiety)
+        steps = codes.shape[-1]
+        h = dt / self.substeps
+        out = np.empty((n, steps + 1, 2))
+        y = np.column_stack((anxiety, stress))
+        out[:, 0] = y
+        for i in range(steps):
+            k_a, k_s = WellnessModel._rate_constants("RK4", codes[..., i], responsiveness)
+            # All Wiener increments of the session in one draw
+            dW = rng.standard_normal((self.substeps, n, 2)) * np.sqrt(h)
+            y = StochasticSimulator._session(y, k_a, k_s, dW, h, self.sigma,
+                                             self.scheme == "Milstein")
+            out[:, i + 1] = y
+        return out
+
+    @staticmethod
+    def _block_task(task):
+        """Worker entry point: one block of paths"""
+        simulator, block_index, anxiety, stress, codes, responsiveness, dt = task
+        return simulator._simulate_block(block_index, anxiety, stress, codes, responsiveness, dt)
+
+    def simulate(self, anxiety, stress, schedule, responsiveness=0.7, dt=1, workers=1, pool=None):
+        """(N, steps+1, 2) noisy trajectories, laid out like WellnessModel.integrate
+
+        schedule is shared (length steps) or per person (N, steps). For
+        several paths per person, repeat the inputs (np.repeat). Blocks run
+        on a process pool when workers > 1 (or pool= is given).
+        """
+        schedule = np.asarray(TechniqueRegistry.encode(schedule))
+        anxiety = np.atleast_1d(np.asarray(anxiety, dtype=float))
+        stress = np.atleast_1d(np.asarray(stress, dtype=float))
+        n = len(anxiety)
+        responsiveness = np.broadcast_to(np.asarray(responsiveness, dtype=float), (n,))
+
+        block = StochasticSimulator.BLOCK
+        tasks = [(self, index, anxiety[start:start + block], stress[start:start + block],
+                  schedule if schedule.ndim == 1 else schedule[start:start + block],
+                  responsiveness[start:start + block], dt)
+                 for index, start in enumerate(range(0, n, block))]
+        if pool is None and workers <= 1:
+            return np.concatenate([StochasticSimulator._block_task(task) for task in tasks])
+
+        owns_pool = pool is None
+        if owns_pool:
+            pool = BatchSimulator.make_pool(workers)
+        try:
+            return np.concatenate(list(pool.map(StochasticSimulator._block_task, tasks)))
+        finally:
+            if owns_pool:
+                pool.shutdown()
+
 # -------------------------------
 # 📈 Enhanced Data Analysis
 # -------------------------------
@@ -608,48 +2066,20 @@ class DataAnalyzer:
     @staticmethod
     def view_dataset_analysis(data):
         """Display comprehensive dataset analysis"""
+        import matplotlib.pyplot as plt
         UI.print_header("DATASET ANALYSIS", "Comprehensive Wellness Metrics")
         
-        # Basic Statistics
-        UI.print_subheader("Basic Statistics")
-        stats = {
-            "Total Persons": len(data),
-            "Avg Anxiety": f"{data['Initial_Anxiety'].mean():.2f}",
-            "Avg Stress": f"{data['Initial_Stress'].mean():.2f}",
-            "Max Anxiety": f"{data['Initial_Anxiety'].max():.2f}",
-            "Min Anxiety": f"{data['Initial_Anxiety'].min():.2f}",
-            "Max Stress": f"{data['Initial_Stress'].max():.2f}",
-            "Min Stress": f"{data['Initial_Stress'].min():.2f}",
-            "Std Anxiety": f"{data['Initial_Anxiety'].std():.2f}",
-            "Std Stress": f"{data['Initial_Stress'].std():.2f}"
-        }
-        
-        for key, value in stats.items():
-            print(f"{Colors.BOLD}{key:20}{Colors.END}: {Colors.CYAN}{value}{Colors.END}")
-        
-        # Correlation Analysis
-        UI.print_subheader("Correlation Analysis")
-        correlation = data['Initial_Anxiety'].corr(data['Initial_Stress'])
-        correlation_color = Colors.GREEN if correlation > 0.7 else Colors.YELLOW if correlation > 0.4 else Colors.RED
-        print(f"{Colors.BOLD}Anxiety-Stress Correlation: {correlation_color}{correlation:.3f}{Colors.END}")
-        
-        if correlation > 0.7:
-            print(f"{Colors.YELLOW}  ⓘ Strong positive correlation: High anxiety often accompanies high stress{Colors.END}")
-        elif correlation > 0.4:
-            print(f"{Colors.YELLOW}  ⓘ Moderate correlation: Anxiety and stress are somewhat related{Colors.END}")
-        else:
-            print(f"{Colors.YELLOW}  ⓘ Weak correlation: Anxiety and stress levels vary independently{Colors.END}")
+        running = RunningStats.of(data['Initial_Anxiety'].to_numpy(), data['Initial_Stress'].to_numpy())
+        DataAnalyzer.print_statistics(running)
         
         # Risk Assessment
         UI.print_subheader("Risk Assessment")
-        high_risk = data[(data['Initial_Anxiety'] >= 8) | (data['Initial_Stress'] >= 8)]
-        medium_risk = data[((data['Initial_Anxiety'] >= 6) & (data['Initial_Anxiety'] < 8)) |
-                          ((data['Initial_Stress'] >= 6) & (data['Initial_Stress'] < 8))]
-        low_risk = data[(data['Initial_Anxiety'] < 6) & (data['Initial_Stress'] < 6)]
+        low_risk, medium_risk, high_risk = SeverityClassifier.classify(
+            data['Initial_Anxiety'].to_numpy(), data['Initial_Stress'].to_numpy())['risk_counts']
         
-        print(f"{Colors.RED}High Risk Persons: {len(high_risk)} ({len(high_risk)/len(data)*100:.1f}%){Colors.END}")
-        print(f"{Colors.YELLOW}Medium Risk Persons: {len(medium_risk)} ({len(medium_risk)/len(data)*100:.1f}%){Colors.END}")
-        print(f"{Colors.GREEN}Low Risk Persons: {len(low_risk)} ({len(low_risk)/len(data)*100:.1f}%){Colors.END}")
+        print(f"{Colors.RED}High Risk Persons: {high_risk} ({high_risk/len(data)*100:.1f}%){Colors.END}")
+        print(f"{Colors.YELLOW}Medium Risk Persons: {medium_risk} ({medium_risk/len(data)*100:.1f}%){Colors.END}")
+        print(f"{Colors.GREEN}Low Risk Persons: {low_risk} ({low_risk/len(data)*100:.1f}%){Colors.END}")
         
         # Ask for visualization
         print(f"\n{Colors.CYAN}{'─' * 50}{Colors.END}")
@@ -683,52 +2113,253 @@ class DataAnalyzer:
             plt.tight_layout()
             plt.show()
 
+    @staticmethod
+    def print_statistics(running):
+        """Print the basic statistics and correlation of a RunningStats"""
+        UI.print_subheader("Basic Statistics")
+        std = running.std()
+        stats = {
+            "Total Persons": running.count,
+            "Avg Anxiety": f"{running.mean[0]:.2f}",
+            "Avg Stress": f"{running.mean[1]:.2f}",
+            "Max Anxiety": f"{running.max[0]:.2f}",
+            "Min Anxiety": f"{running.min[0]:.2f}",
+            "Max Stress": f"{running.max[1]:.2f}",
+            "Min Stress": f"{running.min[1]:.2f}",
+            "Std Anxiety": f"{std[0]:.2f}",
+            "Std Stress": f"{std[1]:.2f}"
+        }
+        
+        for key, value in stats.items():
+            print(f"{Colors.BOLD}{key:20}{Colors.END}: {Colors.CYAN}{value}{Colors.END}")
+        
+        # Correlation Analysis
+        UI.print_subheader("Correlation Analysis")
+        correlation = float(running.correlation())
+        correlation_color = Colors.GREEN if correlation > 0.7 else Colors.YELLOW if correlation > 0.4 else Colors.RED
+        print(f"{Colors.BOLD}Anxiety-Stress Correlation: {correlation_color}{correlation:.3f}{Colors.END}")
+        
+        if correlation > 0.7:
+            print(f"{Colors.YELLOW}  ⓘ Strong positive correlation: High anxiety often accompanies high stress{Colors.END}")
+        elif correlation > 0.4:
+            print(f"{Colors.YELLOW}  ⓘ Moderate correlation: Anxiety and stress are somewhat related{Colors.END}")
+        else:
+            print(f"{Colors.YELLOW}  ⓘ Weak correlation: Anxiety and stress levels vary independently{Colors.END}")
+
+    @staticmethod
+    def stream_stats(path, chunk_size=100_000, workers=1):
+        """RunningStats of a population file read chunk by chunk
+
+        Every chunk is reduced on its own (in a process pool when
+        workers > 1) and merged in file order, so the result does not
+        depend on the number of workers.
+        """
+        from collections import deque
+        pool = BatchSimulator.make_pool(workers) if workers > 1 else None
+        running = RunningStats()
+        pending = deque()
+        try:
+            for chunk in WellnessSimulator.iter_dataset(path, chunk_size):
+                anxiety = BatchSimulator._column(chunk, 'Initial_Anxiety')
+                stress = BatchSimulator._column(chunk, 'Initial_Stress')
+                if pool is None:
+                    running.merge(RunningStats.of(anxiety, stress))
+                    continue
+                pending.append(pool.submit(RunningStats.of, anxiety, stress))
+                # Bound the chunks in flight
+                if len(pending) > 2 * workers:
+                    running.merge(pending.popleft().result())
+            while pending:
+                running.merge(pending.popleft().result())
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return running
+
+    @staticmethod
+    def view_store_analysis(store, chunk_size=100_000):
+        """Summarize final states of a TrajectoryStore one slice at a time"""
+        UI.print_header("SIMULATION RESULTS", f"{len(store)} persons x {store.steps} steps")
+        
+        for name in store.methods:
+            trajectories = store.method(name)
+            per_step = RunningStats()
+            status_counts = np.zeros(len(SeverityClassifier.LEVELS), dtype=np.int64)
+            for start in range(0, len(store), chunk_size):
+                block = trajectories[start:start + chunk_size]
+                per_step.update(block[..., 0], block[..., 1])
+                status_counts += SeverityClassifier.classify(block[:, -1, 0], block[:, -1, 1])['status_counts']
+            final, std = per_step.mean[-1], per_step.std()[-1]
+            reduction = per_step.mean[0] - per_step.mean[-1]
+            
+            UI.print_subheader(f"{name} Method")
+            print(f"{Colors.BOLD}{'Avg Final Anxiety':22}{Colors.END}: {Colors.CYAN}{final[0]:.2f} (± {std[0]:.2f}){Colors.END}")
+            print(f"{Colors.BOLD}{'Avg Final Stress':22}{Colors.END}: {Colors.CYAN}{final[1]:.2f} (± {std[1]:.2f}){Colors.END}")
+            print(f"{Colors.BOLD}{'Avg Anxiety Reduction':22}{Colors.END}: {Colors.GREEN}{reduction[0]:.2f}{Colors.END}")
+            print(f"{Colors.BOLD}{'Avg Stress Reduction':22}{Colors.END}: {Colors.GREEN}{reduction[1]:.2f}{Colors.END}")
+            print(f"{Colors.BOLD}{'Avg Anxiety per Step':22}{Colors.END}: "
+                  f"{' → '.join(f'{value:.2f}' for value in per_step.mean[:, 0])}")
+            print(f"{Colors.BOLD}{'Avg Stress per Step':22}{Colors.END}: "
+                  f"{' → '.join(f'{value:.2f}' for value in per_step.mean[:, 1])}")
+            final_status = ", ".join(f"{label} {count}" for label, count
+                                     in zip(SeverityClassifier.LEVELS, status_counts))
+            print(f"{Colors.BOLD}{'Final Status':22}{Colors.END}: {Colors.CYAN}{final_status}{Colors.END}")
+
 # -------------------------------
 # 🎮 Main Application Class
 # -------------------------------
 
+DATASET_PATH = "anxiety_stress_data.csv"
+
+# Compact column types for streaming very large population files
+STREAM_DTYPES = {
+    'PersonID': 'int32',
+    'Initial_Anxiety': 'float32',
+    'Initial_Stress': 'float32',
+    'Responsiveness': 'float32'
+}
+
+class PersonIndex:
+    """Array-backed PersonID lookup for single people and batches
+
+    Dense IDs (the usual 1..N) use a direct-address slot table, so a
+    lookup is one array read; IDs spread over a much wider range fall
+    back to binary search on a sorted copy.
+    """
+    # Direct addressing while the ID range is at most this many times the row count
+    MAX_SPREAD = 4
+
+    def __init__(self, data):
+        self.person_ids = data['PersonID'].to_numpy(dtype=np.int64)
+        self.anxiety = data['Initial_Anxiety'].to_numpy(dtype=np.float64)
+        self.stress = data['Initial_Stress'].to_numpy(dtype=np.float64)
+        self.responsiveness = (data['Responsiveness'].to_numpy(dtype=np.float64)
+                               if 'Responsiveness' in data.columns else np.full(len(data), 0.7))
+        self._low = int(self.person_ids.min()) if len(data) else 0
+        span = int(self.person_ids.max()) - self._low + 1 if len(data) else 0
+        if span <= PersonIndex.MAX_SPREAD * max(len(data), 1):
+            self._slots = np.full(span, -1, dtype=np.int64)
+            self._slots[self.person_ids - self._low] = np.arange(len(data))
+            self._sorted = None
+            unique = np.count_nonzero(self._slots >= 0) == len(data)
+        else:
+            self._slots = None
+            self._order = np.argsort(self.person_ids, kind='stable')
+            self._sorted = self.person_ids[self._order]
+            unique = not np.any(self._sorted[1:] == self._sorted[:-1])
+        if not unique:
+            raise ValueError("PersonID values must be unique")
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def __contains__(self, person_id):
+        return self.row(person_id) >= 0
+
+    @staticmethod
+    def _whole(person_ids):
+        """(int64 IDs, mask of inputs that are whole numbers); others never match"""
+        values = np.asarray(person_ids)
+        if values.dtype.kind in 'iub':
+            return values.astype(np.int64), np.ones(values.shape, dtype=bool)
+        values = values.astype(np.float64)
+        with np.errstate(invalid='ignore'):
+            whole = np.isfinite(values) & (values == np.floor(values))
+        return np.where(whole, values, 0).astype(np.int64), whole
+
+    def row(self, person_id):
+        """Row of one PersonID, or -1 if it is not in the table"""
+        person_id, whole = PersonIndex._whole(person_id)
+        if not whole or len(self.person_ids) == 0:
+            return -1
+        person_id = int(person_id)
+        if self._slots is not None:
+            offset = person_id - self._low
+            return int(self._slots[offset]) if 0 <= offset < len(self._slots) else -1
+        position = int(np.searchsorted(self._sorted, person_id))
+        if position < len(self._sorted) and self._sorted[position] == person_id:
+            return int(self._order[position])
+        return -1
+
+    def rows(self, person_ids):
+        """Rows of many PersonIDs at once (-1 where missing)"""
+        person_ids, whole = PersonIndex._whole(person_ids)
+        if len(self.person_ids) == 0:
+            return np.full(person_ids.shape, -1, dtype=np.int64)
+        if self._slots is not None:
+            offsets = person_ids - self._low
+            inside = whole & (offsets >= 0) & (offsets < len(self._slots))
+            return np.where(inside, self._slots[np.where(inside, offsets, 0)], -1)
+        positions = np.minimum(np.searchsorted(self._sorted, person_ids), len(self._sorted) - 1)
+        found = whole & (self._sorted[positions] == person_ids)
+        return np.where(found, self._order[positions], -1)
+
+    def get(self, person_id):
+        """(anxiety, stress, responsiveness) of one person; KeyError if unknown"""
+        row = self.row(person_id)
+        if row < 0:
+            raise KeyError(f"PersonID {person_id} not found")
+        return self.anxiety[row], self.stress[row], self.responsiveness[row]
+
+    def take(self, person_ids):
+        """Arrays (anxiety, stress, responsiveness) for many IDs, ready for integrate()"""
+        rows = self.rows(person_ids)
+        if (rows < 0).any():
+            missing = np.asarray(person_ids)[rows < 0]
+            raise KeyError(f"{len(missing)} PersonID(s) not found, e.g. {missing[:5].tolist()}")
+        return self.anxiety[rows], self.stress[rows], self.responsiveness[rows]
+
 class WellnessSimulator:
     """Main application class"""
+    # Seed for backfilling a missing Responsiveness column
+    RESPONSIVENESS_SEED = 42
+    # Sessions searched for the time-to-recovery projection
+    RECOVERY_HORIZON = 30
     
     def __init__(self):
         self.data = self.load_dataset()
+        self.index = PersonIndex(self.data)
         self.current_session = None
     
+    @staticmethod
+    def _fill_responsiveness(data, rng=None):
+        """Add responsiveness column if not present (for backward compatibility)
+
+        Values are seeded; pass one rng across the chunks of a file to get
+        the same column as reading it whole.
+        """
+        if 'Responsiveness' not in data.columns:
+            if rng is None:
+                rng = np.random.default_rng(WellnessSimulator.RESPONSIVENESS_SEED)
+            data['Responsiveness'] = rng.beta(3, 2, len(data)).round(2)
+        return data
+    
+    @staticmethod
+    def read_dataset(path=DATASET_PATH):
+        """Read a population CSV without any UI output"""
+        import pandas as pd
+        return WellnessSimulator._fill_responsiveness(pd.read_csv(path))
+    
+    @staticmethod
+    def iter_dataset(path=DATASET_PATH, chunk_size=100_000):
+        """Stream a population CSV in fixed-size chunks with compact dtypes"""
+        import pandas as pd
+        rng = np.random.default_rng(WellnessSimulator.RESPONSIVENESS_SEED)
+        for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=STREAM_DTYPES):
+            yield WellnessSimulator._fill_responsiveness(chunk, rng)
+    
     def load_dataset(self):
         """Load or create IMPROVED dataset"""
         UI.print_loading("Initializing wellness database")
         
-        if not os.path.exists("anxiety_stress_data.csv"):
+        if not os.path.exists(DATASET_PATH):
             UI.print_info("Creating realistic dataset...")
-            np.random.seed(42)
-            
             n_persons = 30
-            # Create more realistic dataset
-            # Beta distribution gives more realistic psychological distribution
-            base_anxiety = np.random.beta(2, 3, n_persons) * 8 + 2  # Range: 2-10
-            personality_factors = np.random.choice([0.8, 1.0, 1.2], n_persons)  # Stress multipliers
-            base_stress = base_anxiety * personality_factors + np.random.normal(0, 0.8, n_persons)
-            
-            # Add therapeutic responsiveness (how well person responds to treatment)
-            responsiveness = np.random.beta(3, 2, n_persons)  # Most people are responsive
-            
-            # Clip to valid range
-            base_anxiety = np.clip(base_anxiety, 1, 10)
-            base_stress = np.clip(base_stress, 1, 10)
-            
-            data = pd.DataFrame({
-                'PersonID': range(1, n_persons + 1),
-                'Initial_Anxiety': np.round(base_anxiety, 2),
-                'Initial_Stress': np.round(base_stress, 2),
-                'Responsiveness': np.round(responsiveness, 2)
-            })
-            data.to_csv("anxiety_stress_data.csv", index=False)
+            data = CohortGenerator(seed=42).generate(n_persons)
+            data.to_csv(DATASET_PATH, index=False)
             UI.print_success(f"Created realistic dataset with {n_persons} persons")
         else:
-            data = pd.read_csv("anxiety_stress_data.csv")
-            # Add responsiveness column if not present (for backward compatibility)
-            if 'Responsiveness' not in data.columns:
-                data['Responsiveness'] = np.random.beta(3, 2, len(data)).round(2)
+            data = self.read_dataset(DATASET_PATH)
             UI.print_success(f"Loaded dataset with {len(data)} persons")
         
         return data
@@ -737,41 +2368,32 @@ class WellnessSimulator:
         """Analyze a specific person with FIXED methods"""
         UI.print_header("PERSONAL WELLNESS ANALYSIS", "Deep Dive into Individual Metrics")
         
+        # IDs may have gaps, so show the indexed span rather than 1..N
+        first_id, last_id = self.index.person_ids.min(), self.index.person_ids.max()
         while True:
             try:
-                pid = int(input(f"\n{Colors.BOLD}🎯 Enter Person ID (1-{len(self.data)}): {Colors.END}"))
-                if 1 <= pid <= len(self.data):
+                pid = int(input(f"\n{Colors.BOLD}🎯 Enter Person ID ({first_id}-{last_id}): {Colors.END}"))
+                if pid in self.index:
                     break
-                UI.print_error(f"Please enter ID between 1-{len(self.data)}")
+                UI.print_error(f"Person ID {pid} is not in the dataset")
             except ValueError:
                 UI.print_error("Please enter a valid number")
         
-        person = self.data[self.data["PersonID"] == pid].iloc[0]
-        anxiety0 = person["Initial_Anxiety"]
-        stress0 = person["Initial_Stress"]
-        responsiveness = person.get("Responsiveness", 0.7)
+        anxiety0, stress0, responsiveness = self.index.get(pid)
         
         # Display person card
         UI.person_card(pid, anxiety0, stress0, responsiveness)
         
         # Determine recommended steps
-        avg = (anxiety0 + stress0) / 2
-        if avg >= 8:
-            max_steps = 5
-            recommendation = "⚡ Severe levels detected - Intensive program (5 steps)"
-            UI.print_warning(recommendation)
-        elif avg >= 6:
-            max_steps = 4
-            recommendation = "⚠️  High levels - Extended program (4 steps)"
-            UI.print_warning(recommendation)
-        elif avg >= 4:
-            max_steps = 3
-            recommendation = "📊 Moderate levels - Standard program (3 steps)"
-            UI.print_info(recommendation)
-        else:
-            max_steps = 2
-            recommendation = "🌿 Mild levels - Light program (2 steps)"
-            UI.print_success(recommendation)
+        level = SeverityClassifier.status(anxiety0, stress0)
+        max_steps = level + 2
+        recommendation, notify = (
+            ("🌿 Mild levels - Light program (2 steps)", UI.print_success),
+            ("📊 Moderate levels - Standard program (3 steps)", UI.print_info),
+            ("⚠️  High levels - Extended program (4 steps)", UI.print_warning),
+            ("⚡ Severe levels detected - Intensive program (5 steps)", UI.print_warning)
+        )[level]
+        notify(recommendation)
         
         # Get steps
         while True:
@@ -786,50 +2408,39 @@ class WellnessSimulator:
         # Initialize simulation
         UI.print_header("WELLNESS JOURNEY", "Starting Relaxation Protocol")
         
-        # Prepare techniques
-        categories = list(relaxations.keys())
-        selected_techniques = []
-        for i in range(steps):
-            category = categories[i % len(categories)]
-            techs = relaxations[category]
-            technique = techs[i % len(techs)]
-            selected_techniques.append((category, technique))
+        # Prepare techniques: the standard rotation or a plan searched for this person
+        choice = input(f"\n{Colors.BOLD}🧭 Use a personalized technique plan? (y/n): {Colors.END}").lower()
+        if choice == 'y':
+            plan, _ = ScheduleOptimizer.search(anxiety0, stress0, steps, "RK4", responsiveness)
+            selected_techniques = build_schedule(steps, plan)
+            UI.print_info("Personalized plan: " + " → ".join(TechniqueRegistry.decode(plan)))
+        else:
+            selected_techniques = build_schedule(steps)
         
-        # Initialize both methods with same starting values
-        a1, s1 = anxiety0, stress0  # Euler
-        a2, s2 = anxiety0, stress0  # RK4
+        # Simulate both methods with FIXED models from the same starting values
+        categories = [category for category, _ in selected_techniques]
+        euler_traj = WellnessModel.integrate(anxiety0, stress0, categories, "Euler",
+                                             responsiveness=responsiveness)
+        rk4_traj = WellnessModel.integrate(anxiety0, stress0, categories, "RK4",
+                                           responsiveness=responsiveness)
         
         # Store lists separately for each method
-        a1_list, s1_list = [a1], [s1]
-        a2_list, s2_list = [a2], [s2]
+        a1_list, s1_list = euler_traj[:, 0].tolist(), euler_traj[:, 1].tolist()
+        a2_list, s2_list = rk4_traj[:, 0].tolist(), rk4_traj[:, 1].tolist()
         
-        # Simulate each step with FIXED methods
+        # Walk through each step of the journey
         for i in range(steps):
             category, technique = selected_techniques[i]
             
             UI.print_step(i + 1, steps, f"{technique} [{category}]")
             print(f"{Colors.CYAN}{'─' * 50}{Colors.END}")
             
-            # FIXED: Apply methods with responsiveness factor
-            a1_new, s1_new = WellnessModel.euler_method(a1, s1, category, responsiveness=responsiveness)
-            a2_new, s2_new = WellnessModel.rk4_method(a2, s2, category, responsiveness=responsiveness)
-            
-            # Update values for next iteration
-            a1, s1 = a1_new, s1_new
-            a2, s2 = a2_new, s2_new
-            
-            # Store results
-            a1_list.append(a1)
-            s1_list.append(s1)
-            a2_list.append(a2)
-            s2_list.append(s2)
-            
             # Display progress
             print(f"{Colors.GREEN}📊 Current State:{Colors.END}")
-            print(f"{Colors.YELLOW}  Euler:{Colors.END}  Anxiety {a1_list[-2]:.2f} → {a1:.2f} "
-                  f"| Stress {s1_list[-2]:.2f} → {s1:.2f}")
-            print(f"{Colors.CYAN}  RK4:{Colors.END}    Anxiety {a2_list[-2]:.2f} → {a2:.2f} "
-                  f"| Stress {s2_list[-2]:.2f} → {s2:.2f}")
+            print(f"{Colors.YELLOW}  Euler:{Colors.END}  Anxiety {a1_list[i]:.2f} → {a1_list[i + 1]:.2f} "
+                  f"| Stress {s1_list[i]:.2f} → {s1_list[i + 1]:.2f}")
+            print(f"{Colors.CYAN}  RK4:{Colors.END}    Anxiety {a2_list[i]:.2f} → {a2_list[i + 1]:.2f} "
+                  f"| Stress {s2_list[i]:.2f} → {s2_list[i + 1]:.2f}")
             
             # Progress bar
             progress = ((i + 1) / steps) * 100
@@ -907,6 +2518,21 @@ class WellnessSimulator:
         print(f"Total:   {anxiety0+stress0:.1f} → {best_final[0]+best_final[1]:.1f} ({best_improvements[0]+best_improvements[1]:+.1f} points, {total_imp_percent:+.1f}%)")
         print(f"{Colors.CYAN}{'─' * 60}{Colors.END}")
         
+        # Time until the average score reaches MILD, continuing with the rotation after the plan
+        target = SeverityClassifier.THRESHOLDS[0]
+        projection = categories + [category for category, _ in
+                                   build_schedule(self.RECOVERY_HORIZON)[steps:]]
+        recovery, _ = WellnessModel.time_to_target(anxiety0, stress0, projection, target,
+                                                   responsiveness)
+        print(f"\n{Colors.BOLD}⏱️  Time to Recovery (average score < {target:g}):{Colors.END}")
+        if recovery == 0:
+            print(f"{Colors.GREEN}  Already in the MILD range{Colors.END}")
+        elif np.isnan(recovery):
+            print(f"{Colors.YELLOW}  Not within {self.RECOVERY_HORIZON} sessions{Colors.END}")
+        else:
+            within = "within this program" if recovery <= steps else "continuing the rotation"
+            print(f"{Colors.GREEN}  {recovery:.2f} sessions{Colors.END} ({within})")
+        
         # Store session data
         self.current_session = {
             'person_id': pid,
@@ -1030,29 +2656,25 @@ class WellnessSimulator:
                 print(f"\n{Colors.BOLD}{'ID':<5} {'Anxiety':<10} {'Stress':<10} {'Status':<15}{Colors.END}")
                 print(f"{Colors.CYAN}{'─' * 45}{Colors.END}")
                 
-                for _, row in self.data.head(15).iterrows():
-                    anxiety = row['Initial_Anxiety']
-                    stress = row['Initial_Stress']
-                    avg = (anxiety + stress) / 2
-                    
-                    if avg >= 8:
-                        status = "SEVERE"
-                        color = Colors.RED
-                    elif avg >= 6:
-                        status = "HIGH"
-                        color = Colors.YELLOW
-                    elif avg >= 4:
-                        status = "MODERATE"
-                        color = Colors.BLUE
-                    else:
-                        status = "MILD"
-                        color = Colors.GREEN
-                    
-                    anxiety_color = Colors.ANXIETY_SEVERE if anxiety >= 8 else Colors.ANXIETY_HIGH if anxiety >= 6 else Colors.ANXIETY_MED if anxiety >= 4 else Colors.ANXIETY_LOW
-                    stress_color = Colors.STRESS_SEVERE if stress >= 8 else Colors.STRESS_HIGH if stress >= 6 else Colors.STRESS_MED if stress >= 4 else Colors.STRESS_LOW
+                anxiety_all = self.data['Initial_Anxiety'].to_numpy()
+                stress_all = self.data['Initial_Stress'].to_numpy()
+                labels = SeverityClassifier.classify(anxiety_all, stress_all)
+                status_colors = (Colors.GREEN, Colors.BLUE, Colors.YELLOW, Colors.RED)
+                
+                shown = min(15, len(self.data))
+                for pid, anxiety, stress, level in zip(self.data['PersonID'].to_numpy()[:shown],
+                                                       anxiety_all[:shown], stress_all[:shown],
+                                                       labels['status'][:shown]):
+                    anxiety_color = Colors.ANXIETY_LEVELS[SeverityClassifier.level(anxiety)]
+                    stress_color = Colors.STRESS_LEVELS[SeverityClassifier.level(stress)]
                     
-                    print(f"{row['PersonID']:<5} {anxiety_color}{anxiety:<10.2f}{Colors.END} "
-                          f"{stress_color}{stress:<10.2f}{Colors.END} {color}{status:<15}{Colors.END}")
+                    print(f"{pid:<5} {anxiety_color}{anxiety:<10.2f}{Colors.END} "
+                          f"{stress_color}{stress:<10.2f}{Colors.END} "
+                          f"{status_colors[level]}{SeverityClassifier.LEVELS[level]:<15}{Colors.END}")
+                
+                print(f"{Colors.CYAN}{'─' * 45}{Colors.END}")
+                for label, count, color in zip(SeverityClassifier.LEVELS, labels['status_counts'], status_colors):
+                    print(f"{color}{label:<10}{Colors.END} {count:>8} ({count / len(self.data) * 100:.1f}%)")
                 
                 input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.END}")
             
@@ -1100,11 +2722,869 @@ class WellnessSimulator:
 
             
        
+# -------------------------------
+# 🧪 Synthetic Cohorts
+# -------------------------------
+
+class CohortGenerator:
+    """Reproducible synthetic populations of any size, made chunk by chunk
+
+    Chunk k of a cohort always draws from child k of SeedSequence(seed)
+    and chunk boundaries depend only on chunk_size, so the same seed
+    gives bit-identical people however many workers produce them.
+    """
+
+    def __init__(self, seed=42, chunk_size=1_000_000):
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _draw(seed, chunk_index, start, n_persons):
+        """Columns of one chunk, drawn from its own seed stream"""
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+        # Beta distribution gives more realistic psychological distribution
+        base_anxiety = rng.beta(2, 3, n_persons) * 8 + 2  # Range: 2-10
+        personality_factors = rng.choice([0.8, 1.0, 1.2], n_persons)  # Stress multipliers
+        base_stress = base_anxiety * personality_factors + rng.normal(0, 0.8, n_persons)
+        
+        # Add therapeutic responsiveness (how well person responds to treatment)
+        responsiveness = rng.beta(3, 2, n_persons)  # Most people are responsive
+        
+        return {
+            'PersonID': np.arange(start + 1, start + n_persons + 1),
+            'Initial_Anxiety': np.round(np.clip(base_anxiety, 1, 10), 2),
+            'Initial_Stress': np.round(np.clip(base_stress, 1, 10), 2),
+            'Responsiveness': np.round(responsiveness, 2)
+        }
+
+    def _chunks(self, n_persons):
+        """(seed, chunk_index, start, size) of every chunk of a cohort"""
+        return [(self.seed, index, start, min(self.chunk_size, n_persons - start))
+                for index, start in enumerate(range(0, n_persons, self.chunk_size))]
+
+    def generate(self, n_persons):
+        """Whole cohort as a DataFrame (for sizes that fit in memory)"""
+        import pandas as pd
+        columns = [CohortGenerator._draw(*chunk) for chunk in self._chunks(n_persons)]
+        return pd.DataFrame({name: np.concatenate([chunk[name] for chunk in columns])
+                             for name in ('PersonID', 'Initial_Anxiety', 'Initial_Stress',
+                                          'Responsiveness')})
+
+    @staticmethod
+    def _chunk_csv(chunk):
+        """Worker entry point: one chunk rendered as CSV text"""
+        import pandas as pd
+        seed, index, start, size = chunk
+        return pd.DataFrame(CohortGenerator._draw(seed, index, start, size)).to_csv(
+            index=False, header=index == 0)
+
+    def write(self, path, n_persons, workers=1):
+        """Write a cohort CSV chunk by chunk; returns the number of persons
+
+        Chunks are generated in a process pool when workers > 1 and
+        appended in order as they finish, so memory holds only a few
+        chunks at a time.
+        """
+        from collections import deque
+        pool = BatchSimulator.make_pool(workers) if workers > 1 else None
+        pending = deque()
+        try:
+            with open(path, "w", newline="") as f:
+                for chunk in self._chunks(n_persons):
+                    if pool is None:
+                        f.write(CohortGenerator._chunk_csv(chunk))
+                        continue
+                    pending.append(pool.submit(CohortGenerator._chunk_csv, chunk))
+                    # Bound the chunks in flight
+                    if len(pending) > 2 * workers:
+                        f.write(pending.popleft().result())
+                while pending:
+                    f.write(pending.popleft().result())
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return n_persons
+
+# -------------------------------
+# 🗂️ Headless Batch Simulation
+# -------------------------------
+
+class ResultStore:
+    """Chunk-appendable result file: .npz or .parquet (columnar) or .csv
+
+    Columnar files hold one row per person: the initial state, per-method
+    trajectories ({method}_Anxiety / {method}_Stress, one value per step),
+    the reductions and the best method.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower().lstrip('.')
+        self.chunks = 0
+        self._parquet = None
+        if self.format == 'parquet':
+            ResultStore._require_pyarrow()
+        # Start from an empty file; chunks are appended afterwards
+        if os.path.exists(path):
+            os.remove(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _require_pyarrow():
+        """Import pyarrow for the Parquet format"""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet results need pyarrow (pip install pyarrow); "
+                              "use a .npz output instead") from None
+        return pyarrow, pyarrow.parquet
+
+    def append(self, results):
+        """Append one chunk of BatchSimulator results"""
+        if self.format == 'csv':
+            BatchSimulator.to_frame(results).to_csv(self.path, index=False, mode='a',
+                                                    header=self.chunks == 0)
+        elif self.format == 'npz':
+            self._append_npz(BatchSimulator.summary_columns(results))
+        elif self.format == 'parquet':
+            self._append_parquet(BatchSimulator.summary_columns(results))
+        else:
+            raise ValueError(f"Unsupported result format: {self.path}")
+        self.chunks += 1
+
+    def _append_npz(self, columns):
+        """Add each column of the chunk as its own .npy member of the archive"""
+        import zipfile
+
+        with zipfile.ZipFile(self.path, mode='a', compression=zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            for name, values in columns.items():
+                with archive.open(f"chunk{self.chunks:06d}/{name}.npy", mode='w',
+                                  force_zip64=True) as member:
+                    np.lib.format.write_array(member, np.ascontiguousarray(values),
+                                              allow_pickle=False)
+
+    def _append_parquet(self, columns):
+        """Write the chunk as one Parquet row group"""
+        pa, pq = ResultStore._require_pyarrow()
+        arrays = {}
+        for name, values in columns.items():
+            if values.ndim == 2:
+                arrays[name] = pa.FixedSizeListArray.from_arrays(
+                    pa.array(values.reshape(-1)), values.shape[1])
+            else:
+                arrays[name] = pa.array(values)
+        table = pa.table(arrays)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table)
+
+    def close(self):
+        """Finish the file"""
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+    @staticmethod
+    def read(path, columns=None):
+        """Read selected columns (default: all) of a columnar result file"""
+        file_format = os.path.splitext(path)[1].lower().lstrip('.')
+        if file_format == 'npz':
+            # NpzFile only decompresses the members that are accessed
+            with np.load(path, allow_pickle=False) as archive:
+                names = {}
+                for key in archive.files:
+                    chunk, name = key.split('/', 1)
+                    names.setdefault(name, []).append(key)
+                wanted = names.keys() if columns is None else columns
+                return {name: np.concatenate([archive[key] for key in sorted(names[name])])
+                        for name in wanted}
+        if file_format == 'parquet':
+            pa, pq = ResultStore._require_pyarrow()
+            table = pq.read_table(path, columns=columns)
+            result = {}
+            for name in table.column_names:
+                column = table.column(name).combine_chunks()
+                if pa.types.is_fixed_size_list(column.type):
+                    result[name] = column.flatten().to_numpy().reshape(len(column), column.type.list_size)
+                else:
+                    result[name] = column.to_numpy(zero_copy_only=False)
+            return result
+        raise ValueError(f"Not a columnar result file: {path}")
+
+class TrajectoryStore:
+    """Out-of-core trajectory array shared between processes via numpy.memmap
+
+    A store is a directory holding trajectories.npy with shape
+    (methods, N, steps+1, 2), person_ids.npy and meta.json. Slices are
+    paged in on access, so any number of readers can share one result.
+    """
+
+    def __init__(self, path, mode='r'):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.methods = meta['methods']
+        self.steps = meta['steps']
+        self.schedule = [tuple(item) for item in meta['schedule']]
+        self.trajectories = np.load(os.path.join(path, 'trajectories.npy'), mmap_mode=mode)
+        self.person_ids = np.load(os.path.join(path, 'person_ids.npy'), mmap_mode=mode)
+
+    @staticmethod
+    def create(path, n_persons, steps, methods):
+        """Allocate an empty store on disk and open it for writing"""
+        os.makedirs(path, exist_ok=True)
+        np.lib.format.open_memmap(os.path.join(path, 'trajectories.npy'), mode='w+',
+                                  dtype=np.float64, shape=(len(methods), n_persons, steps + 1, 2))
+        np.lib.format.open_memmap(os.path.join(path, 'person_ids.npy'), mode='w+',
+                                  dtype=np.int64, shape=(n_persons,))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'methods': list(methods), 'steps': steps,
+                       'schedule': build_schedule(steps)}, f, indent=2)
+        return TrajectoryStore(path, mode='r+')
+
+    def __len__(self):
+        return self.trajectories.shape[1]
+
+    def method(self, name):
+        """(N, steps+1, 2) view of one method's trajectories"""
+        return self.trajectories[self.methods.index(name)]
+
+    def flush(self):
+        """Push pending writes to disk"""
+        self.trajectories.flush()
+        self.person_ids.flush()
+
+class ResultCache:
+    """On-disk cache of BatchSimulator.simulate results, addressed by content
+
+    An entry is <key>.npz where key is the sha256 of the input columns,
+    steps, methods, schedule and model coefficients, so an edited CSV or
+    coefficient table simply misses. Hits refresh the file's mtime; once
+    the directory exceeds max_bytes the least recently used entries are
+    deleted. Entries are written to a temporary file and renamed, so
+    concurrent readers never see a partial one.
+    """
+    # Bump when the model equations change in a way the coefficients don't show
+    VERSION = 1
+    # Temporary files older than this (seconds) are left over from failed writes
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self, path, max_bytes=1 << 30):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(data, steps, methods, schedule):
+        """Hex digest identifying one simulation of data"""
+        import hashlib
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            'version': ResultCache.VERSION,
+            'steps': steps,
+            'methods': list(methods),
+            'schedule': schedule,
+            'stress_ratio': dict(TechniqueRegistry.STRESS_RATIO)
+        }, sort_keys=True).encode())
+        for method in sorted(TechniqueRegistry.K_A):
+            digest.update(TechniqueRegistry.K_A[method].tobytes())
+        digest.update(np.ascontiguousarray(data['PersonID'].to_numpy(dtype=np.int64)).tobytes())
+        for name in ('Initial_Anxiety', 'Initial_Stress', 'Responsiveness'):
+            digest.update(np.ascontiguousarray(BatchSimulator._column(data, name)).tobytes())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def get(self, key):
+        """Stored results for key, or None (unreadable entries are deleted)"""
+        from zipfile import BadZipFile
+        path = self._entry(key)
+        try:
+            with np.load(path) as archive:
+                meta = json.loads(str(archive['meta']))
+                results = {name: archive[name] for name in archive.files if name != 'meta'}
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, EOFError, KeyError, BadZipFile):
+            # Truncated or corrupt entry: drop it so the caller recomputes
+            self.misses += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        self.hits += 1
+        results.update(steps=meta['steps'], methods=meta['methods'],
+                       schedule=[tuple(item) for item in meta['schedule']])
+        return results
+
+    def put(self, key, results):
+        """Store results under key, then evict down to max_bytes"""
+        arrays = {name: value for name, value in results.items() if isinstance(value, np.ndarray)}
+        meta = {'steps': results['steps'], 'methods': results['methods'],
+                'schedule': results['schedule']}
+        path = self._entry(key)
+        partial = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(partial, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes
+
+        Temporary files count towards the size; those older than
+        STALE_TEMP_SECONDS are orphans of failed writes and are deleted.
+        """
+        entries = []
+        total = 0
+        stale = time.time() - ResultCache.STALE_TEMP_SECONDS
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                if stat.st_mtime < stale:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+                else:
+                    total += stat.st_size
+            elif entry.name.endswith('.npz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total += sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Delete every entry and temporary file"""
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(('.npz', '.tmp')):
+                os.remove(entry.path)
+
+class BatchSimulator:
+    """Non-interactive simulation of a whole population"""
+
+    METHOD_CHOICES = {
+        "euler": ["Euler"],
+        "rk4": ["RK4"],
+        "both": ["Euler", "RK4"]
+    }
+
+    @staticmethod
+    def _init_worker(backend, cache_size):
+        """Pool initializer: same backend and (per process) step cache as the parent"""
+        WellnessModel.set_backend(backend)
+        WellnessModel.set_step_cache(cache_size)
+
+    @staticmethod
+    def make_pool(workers):
+        """Process pool whose workers use the current integrate() backend and step cache"""
+        cache = WellnessModel.step_cache
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers, initializer=BatchSimulator._init_worker,
+                                   initargs=(WellnessModel.backend,
+                                             cache.maxsize if cache is not None else None))
+
+    @staticmethod
+    def _report_cache(workers):
+        """Print the step cache counters (only the parent's when serial)"""
+        cache = WellnessModel.step_cache
+        if cache is None or workers > 1:
+            return
+        info = cache.info()
+        print(f"Step cache: {info['hits']} hits, {info['misses']} misses "
+              f"({info['hit_rate']:.1%}), {info['size']}/{info['maxsize']} entries")
+
+    @staticmethod
+    def _simulate_chunk(task):
+        """Worker entry point: simulate one slice of the population"""
+        anxiety0, stress0, responsiveness, categories, methods = task
+        return {name: WellnessModel.integrate(anxiety0, stress0, categories, name,
+                                              responsiveness=responsiveness)
+                for name in methods}
+
+    @staticmethod
+    def _column(data, name):
+        """Read a score column as float64"""
+        values = data[name].to_numpy(dtype=float)
+        if data[name].dtype == np.float32:
+            # Compact streamed columns: scores are stored with 2 decimals,
+            # so rounding recovers exactly the value written in the CSV
+            values = np.round(values, 2)
+        return values
+
+    @staticmethod
+    def simulate(data, steps, method="both", workers=1, chunk_size=None, pool=None,
+                 result_cache=None):
+        """Simulate every person for the given number of steps
+
+        With workers > 1 the population is split into chunks that run on a
+        process pool (pass pool= to reuse one across calls); chunks are
+        written back in input order, so the result is identical to a serial
+        run. With a ResultCache, identical inputs are read back from disk.
+        """
+        schedule = build_schedule(steps)
+        if result_cache is not None:
+            key = ResultCache.key(data, steps, BatchSimulator.METHOD_CHOICES[method], schedule)
+            results = result_cache.get(key)
+            if results is None:
+                results = BatchSimulator.simulate(data, steps, method, workers, chunk_size, pool)
+                result_cache.put(key, results)
+            return results
+        anxiety0 = BatchSimulator._column(data, 'Initial_Anxiety')
+        stress0 = BatchSimulator._column(data, 'Initial_Stress')
+        responsiveness = BatchSimulator._column(data, 'Responsiveness')
+
+        results = {
+            'PersonID': data['PersonID'].to_numpy(),
+            'Initial_Anxiety': anxiety0,
+            'Initial_Stress': stress0,
+            'Responsiveness': responsiveness,
+            'steps': steps,
+            'schedule': schedule,
+            'methods': BatchSimulator.METHOD_CHOICES[method]
+        }
+
+        categories = [category for category, _ in schedule]
+        n_persons = len(anxiety0)
+        if workers <= 1 or n_persons < 2:
+            # trajectory[:, i, 0] is anxiety after i steps, [:, i, 1] is stress
+            results.update(BatchSimulator._simulate_chunk(
+                (anxiety0, stress0, responsiveness, categories, results['methods'])))
+            return results
+
+        if chunk_size is None:
+            # A few chunks per worker keeps the pool balanced
+            chunk_size = max(1, -(-n_persons // (workers * 4)))
+        starts = range(0, n_persons, chunk_size)
+        tasks = [(anxiety0[i:i + chunk_size], stress0[i:i + chunk_size],
+                  responsiveness[i:i + chunk_size], categories, results['methods'])
+                 for i in starts]
+
+        for name in results['methods']:
+            results[name] = np.empty((n_persons, steps + 1, 2))
+        owns_pool = pool is None
+        if owns_pool:
+            pool = BatchSimulator.make_pool(workers)
+        try:
+            for start, part in zip(starts, pool.map(BatchSimulator._simulate_chunk, tasks)):
+                for name, trajectory in part.items():
+                    results[name][start:start + len(trajectory)] = trajectory
+        finally:
+            if owns_pool:
+                pool.shutdown()
+
+        return results
+
+    @staticmethod
+    def to_frame(results):
+        """Flatten results into one row per person per step"""
+        import pandas as pd
+        n_persons = len(results['PersonID'])
+        steps = results['steps']
+        categories = [""] + [category for category, _ in results['schedule']]
+        techniques = [""] + [technique for _, technique in results['schedule']]
+
+        frame = pd.DataFrame({
+            'PersonID': np.repeat(results['PersonID'], steps + 1),
+            'Step': np.tile(np.arange(steps + 1), n_persons),
+            'Category': np.tile(categories, n_persons),
+            'Technique': np.tile(techniques, n_persons)
+        })
+        for name in results['methods']:
+            frame[f'{name}_Anxiety'] = results[name][:, :, 0].reshape(-1)
+            frame[f'{name}_Stress'] = results[name][:, :, 1].reshape(-1)
+        return frame
+
+    @staticmethod
+    def summary_columns(results):
+        """Per-person columns: trajectories, reductions and the best method"""
+        columns = {
+            'PersonID': results['PersonID'],
+            'Initial_Anxiety': results['Initial_Anxiety'],
+            'Initial_Stress': results['Initial_Stress'],
+            'Responsiveness': results['Responsiveness']
+        }
+        totals = {}
+        for name in results['methods']:
+            trajectory = results[name]
+            columns[f'{name}_Anxiety'] = trajectory[:, :, 0]
+            columns[f'{name}_Stress'] = trajectory[:, :, 1]
+            anxiety_red = results['Initial_Anxiety'] - trajectory[:, -1, 0]
+            stress_red = results['Initial_Stress'] - trajectory[:, -1, 1]
+            columns[f'{name}_Anxiety_Reduction'] = anxiety_red
+            columns[f'{name}_Stress_Reduction'] = stress_red
+            totals[name] = columns[f'{name}_Total_Reduction'] = anxiety_red + stress_red
+        if {'Euler', 'RK4'} <= set(totals):
+            # Same rule as analyze_person: RK4 only wins on a strictly larger reduction
+            columns['Best_Method'] = np.where(totals['RK4'] > totals['Euler'],
+                                              'RK4 Method', 'Euler Method')
+        return columns
+
+    @staticmethod
+    def _render_chunk(task):
+        """Worker entry point: render the figures of one slice of people"""
+        settings, out_dir, person_ids, euler, rk4 = task
+        renderer = ReportRenderer.shared(*settings)
+        for person_id, euler_traj, rk4_traj in zip(person_ids, euler, rk4):
+            renderer.render(out_dir, person_id, euler_traj, rk4_traj)
+        return len(person_ids)
+
+    @staticmethod
+    def render_reports(results, out_dir, kinds=ReportRenderer.KINDS, fmt="png", workers=1,
+                       chunk_size=None, dpi=100):
+        """Write report cards and/or journey plots of every person in results
+
+        Needs Euler and RK4 trajectories. Each worker process keeps one
+        ReportRenderer and reuses its figures for all of its people.
+        Returns the number of people rendered.
+        """
+        if not {'Euler', 'RK4'} <= set(results['methods']):
+            raise ValueError("Rendering needs both Euler and RK4 trajectories (method='both')")
+        os.makedirs(out_dir, exist_ok=True)
+        settings = (results['steps'], tuple(technique for _, technique in results['schedule']),
+                    tuple(kinds), fmt, dpi)
+        n_persons = len(results['PersonID'])
+        if chunk_size is None:
+            chunk_size = max(1, -(-n_persons // (max(workers, 1) * 4)))
+        tasks = [(settings, out_dir, results['PersonID'][i:i + chunk_size],
+                  results['Euler'][i:i + chunk_size], results['RK4'][i:i + chunk_size])
+                 for i in range(0, n_persons, chunk_size)]
+
+        if workers <= 1:
+            return sum(BatchSimulator._render_chunk(task) for task in tasks)
+        with BatchSimulator.make_pool(workers) as pool:
+            return sum(pool.map(BatchSimulator._render_chunk, tasks))
+
+    @staticmethod
+    def write_results(results, path):
+        """Write results to .csv (per step), .npz or .parquet (per person)"""
+        with ResultStore(path) as store:
+            store.append(results)
+
+    @staticmethod
+    def _simulate_into_store(task):
+        """Worker entry point: simulate one slice straight into the store"""
+        store_path, start, anxiety0, stress0, responsiveness, categories = task
+        store = TrajectoryStore(store_path, mode='r+')
+        stop = start + len(anxiety0)
+        for name in store.methods:
+            WellnessModel.integrate(anxiety0, stress0, categories, name,
+                                    responsiveness=responsiveness,
+                                    out=store.method(name)[start:stop])
+        store.flush()
+        return stop - start
+
+    @staticmethod
+    def run_to_store(path, store_path, steps, method="both", rows=100_000, workers=1):
+        """Stream a dataset into a memory-mapped TrajectoryStore
+
+        Workers open the store themselves and write their slice in place,
+        so trajectories never travel back through the parent process.
+        """
+        with open(path) as f:
+            n_persons = sum(1 for line in f if line.strip()) - 1
+        store = TrajectoryStore.create(store_path, n_persons, steps,
+                                       BatchSimulator.METHOD_CHOICES[method])
+        categories = [category for category, _ in store.schedule]
+
+        pool = BatchSimulator.make_pool(workers) if workers > 1 else None
+        start = 0
+        try:
+            for chunk in WellnessSimulator.iter_dataset(path, rows):
+                stop = start + len(chunk)
+                store.person_ids[start:stop] = chunk['PersonID'].to_numpy()
+                anxiety0 = BatchSimulator._column(chunk, 'Initial_Anxiety')
+                stress0 = BatchSimulator._column(chunk, 'Initial_Stress')
+                responsiveness = BatchSimulator._column(chunk, 'Responsiveness')
+
+                task_size = len(chunk) if pool is None else max(1, -(-len(chunk) // (workers * 4)))
+                tasks = [(store_path, start + i, anxiety0[i:i + task_size], stress0[i:i + task_size],
+                          responsiveness[i:i + task_size], categories)
+                         for i in range(0, len(chunk), task_size)]
+                if pool is None:
+                    for task in tasks:
+                        BatchSimulator._simulate_into_store(task)
+                else:
+                    list(pool.map(BatchSimulator._simulate_into_store, tasks))
+                start = stop
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        store.flush()
+        return store
+
+    @staticmethod
+    def run_streaming(path, output, steps, method="both", rows=100_000, workers=1):
+        """Read, simulate and write the population one chunk at a time
+
+        Only one chunk of input and its trajectories are held in memory,
+        so peak memory depends on rows, not on the size of the file.
+        """
+        pool = BatchSimulator.make_pool(workers) if workers > 1 else None
+        n_persons = 0
+        try:
+            with ResultStore(output) as store:
+                for chunk in WellnessSimulator.iter_dataset(path, rows):
+                    store.append(BatchSimulator.simulate(chunk, steps, method, workers, pool=pool))
+                    n_persons += len(chunk)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return n_persons
+
+def run_cli(argv=None):
+    """Headless entry point: simulate a dataset and write the trajectories"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Simulate every person in a dataset without the interactive menu")
+    parser.add_argument("--data", default=DATASET_PATH,
+                        help="population CSV (PersonID, Initial_Anxiety, Initial_Stress[, Responsiveness])")
+    parser.add_argument("--steps", type=int, default=5, help="relaxation steps per person")
+    parser.add_argument("--method", choices=sorted(BatchSimulator.METHOD_CHOICES), default="both",
+                        help="numerical method(s) to run")
+    parser.add_argument("--output", default="simulation_results.csv",
+                        help="output file: .csv (one row per step), .npz or .parquet (columnar)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, serial)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="persons per worker task")
+    parser.add_argument("--stream", type=int, default=None, metavar="ROWS",
+                        help="read, simulate and write the dataset ROWS persons at a time")
+    parser.add_argument("--store", default=None, metavar="DIR",
+                        help="write trajectories to a memory-mapped store instead of --output")
+    parser.add_argument("--backend", choices=WellnessModel.BACKENDS, default="numpy",
+                        help="Euler/RK4 engine; numba falls back to numpy if not installed")
+    parser.add_argument("--memo", type=int, default=None, metavar="SIZE",
+                        help="memoize up to SIZE quantized Euler/RK4 steps (LRU, per process)")
+    parser.add_argument("--render", default=None, metavar="DIR",
+                        help="also write per-person figures to DIR (needs --method both)")
+    parser.add_argument("--render-kinds", default="report,journey",
+                        help="comma separated figures to render: report,journey")
+    parser.add_argument("--render-format", choices=ReportRenderer.FORMATS, default="png",
+                        help="figure file format")
+    parser.add_argument("--summary", action="store_true",
+                        help="print per-method final-state statistics of the --store trajectories")
+    parser.add_argument("--journey-plot", nargs=2, default=None, metavar=("PERSON_ID", "FILE"),
+                        help="save one person's journey from the --store trajectories (needs --method both)")
+    parser.add_argument("--cohort-plot", default=None, metavar="FILE",
+                        help="save a per-method cohort density image (.png/.pdf) of all trajectories")
+    parser.add_argument("--generate", type=int, default=None, metavar="N",
+                        help="write a reproducible synthetic cohort of N persons to --data and exit")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for --generate and --ensemble")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="reuse results of identical in-memory runs from an on-disk cache")
+    parser.add_argument("--cache-size", type=float, default=1024, metavar="MB",
+                        help="--cache-dir size cap; least recently used entries go first")
+    parser.add_argument("--analyze", action="store_true",
+                        help="print streamed dataset statistics instead of simulating")
+    parser.add_argument("--optimize", default=None, metavar="FILE",
+                        help="write each person's best category plan (CSV) instead of simulating")
+    parser.add_argument("--beam-width", type=int, default=8,
+                        help="schedules kept per person and step by --optimize")
+    parser.add_argument("--noise", type=float, default=None, metavar="SIGMA",
+                        help="also simulate one noisy path per person with multiplicative noise SIGMA")
+    parser.add_argument("--sde-scheme", choices=StochasticSimulator.SCHEMES, default="Milstein",
+                        help="SDE integrator for --noise")
+    parser.add_argument("--substeps", type=int, default=16, help="SDE sub-steps per session")
+    parser.add_argument("--recovery", action="store_true",
+                        help="write each person's time until the average score reaches --target "
+                             "(within --steps sessions) to --output (CSV) instead of simulating")
+    parser.add_argument("--ensemble", type=int, default=None, metavar="K",
+                        help="write per-step percentile bands over K responsiveness samples "
+                             "per person to --output (CSV)")
+    parser.add_argument("--effectiveness-sd", type=float, default=0.0,
+                        help="lognormal spread of technique effectiveness in --ensemble samples")
+    parser.add_argument("--target", type=float, default=4.0,
+                        help="score target for --ensemble (both scores) and --recovery (average)")
+    args = parser.parse_args(argv)
+    WellnessModel.set_backend(args.backend)
+
+    if args.steps < 1:
+        parser.error("--steps must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.stream is not None and args.stream < 1:
+        parser.error("--stream must be at least 1")
+    render_kinds = tuple(kind for kind in args.render_kinds.split(",") if kind)
+    if args.render:
+        if args.method != "both":
+            parser.error("--render needs --method both")
+        if args.stream or args.store:
+            parser.error("--render works on in-memory runs, not with --stream/--store")
+        if not render_kinds or not set(render_kinds) <= set(ReportRenderer.KINDS):
+            parser.error(f"--render-kinds must be taken from {','.join(ReportRenderer.KINDS)}")
+    if (args.summary or args.journey_plot) and not args.store:
+        parser.error("--summary and --journey-plot read the trajectories of a --store run")
+    if args.journey_plot:
+        if args.method != "both":
+            parser.error("--journey-plot needs --method both")
+        try:
+            journey_id = int(args.journey_plot[0])
+        except ValueError:
+            parser.error("--journey-plot PERSON_ID must be an integer")
+    if args.cohort_plot and args.stream and not args.store:
+        parser.error("--cohort-plot needs an in-memory run or --store")
+    if args.cache_dir and (args.stream or args.store):
+        parser.error("--cache-dir works on in-memory runs, not with --stream/--store")
+    if args.beam_width < 1:
+        parser.error("--beam-width must be at least 1")
+    if args.noise is not None:
+        if args.noise < 0:
+            parser.error("--noise must not be negative")
+        if args.substeps < 1:
+            parser.error("--substeps must be at least 1")
+        if args.stream or args.store:
+            parser.error("--noise works on in-memory runs, not with --stream/--store")
+    if args.ensemble is not None and args.ensemble < 1:
+        parser.error("--ensemble must be at least 1")
+    if args.effectiveness_sd < 0:
+        parser.error("--effectiveness-sd must not be negative")
+    if args.memo is not None:
+        if args.memo < 1:
+            parser.error("--memo must be at least 1")
+        WellnessModel.set_step_cache(args.memo)
+
+    if args.generate is not None:
+        if args.generate < 1:
+            parser.error("--generate must be at least 1")
+        CohortGenerator(args.seed).write(args.data, args.generate, workers=args.workers)
+        UI.print_success(f"Generated {args.generate} persons (seed {args.seed}) -> {args.data}")
+        return 0
+
+    if args.analyze:
+        running = DataAnalyzer.stream_stats(args.data, args.stream or 100_000, args.workers)
+        DataAnalyzer.print_statistics(running)
+        return 0
+
+    if args.optimize:
+        # Plans are searched with one engine; "both" uses RK4
+        method = BatchSimulator.METHOD_CHOICES[args.method][-1]
+        data = WellnessSimulator.read_dataset(args.data)
+        ScheduleOptimizer.plans(data, args.steps, method, args.beam_width).to_csv(
+            args.optimize, index=False)
+        UI.print_success(f"Optimized {len(data)} {method} plans x {args.steps} steps -> {args.optimize}")
+        return 0
+
+    if args.recovery:
+        import pandas as pd
+        data = WellnessSimulator.read_dataset(args.data)
+        times, nfev = WellnessModel.time_to_target(
+            BatchSimulator._column(data, 'Initial_Anxiety'),
+            BatchSimulator._column(data, 'Initial_Stress'),
+            [category for category, _ in build_schedule(args.steps)], args.target,
+            BatchSimulator._column(data, 'Responsiveness'))
+        pd.DataFrame({'PersonID': data['PersonID'], 'Recovery_Time': times}).to_csv(
+            args.output, index=False)
+        reached = ~np.isnan(times)
+        UI.print_success(f"Recovery times of {len(data)} persons -> {args.output}")
+        UI.print_info(f"{reached.mean():.1%} reach {args.target:g} within {args.steps} sessions "
+                      f"(median {np.median(times[reached]) if reached.any() else np.nan:.2f}); "
+                      f"{nfev.mean():.0f} RHS evaluations per person")
+        return 0
+
+    if args.ensemble:
+        method = BatchSimulator.METHOD_CHOICES[args.method][-1]
+        data = WellnessSimulator.read_dataset(args.data)
+        ensemble = ResponsivenessEnsemble(args.ensemble, effectiveness_sd=args.effectiveness_sd,
+                                          seed=args.seed, target=args.target)
+        summary = ensemble.run(BatchSimulator._column(data, 'Initial_Anxiety'),
+                               BatchSimulator._column(data, 'Initial_Stress'),
+                               [category for category, _ in build_schedule(args.steps)],
+                               BatchSimulator._column(data, 'Responsiveness'), method)
+        ResponsivenessEnsemble.to_frame(data['PersonID'], summary).to_csv(args.output, index=False)
+        UI.print_success(f"Ensemble of {args.ensemble} {method} samples x {len(data)} persons -> {args.output}")
+        UI.print_info(f"Mean P(both scores <= {args.target:g}) after {args.steps} steps: "
+                      f"{summary['p_target'][:, -1].mean():.1%}")
+        return 0
+
+    if args.store:
+        store = BatchSimulator.run_to_store(args.data, args.store, args.steps, args.method,
+                                            rows=args.stream or 100_000, workers=args.workers)
+        UI.print_success(f"Simulated {len(store)} persons x {args.steps} steps -> {args.store}")
+        BatchSimulator._report_cache(args.workers)
+        if args.cohort_plot:
+            Visualizations.plot_cohort_density(CohortDensity.from_store(store), args.cohort_plot)
+            UI.print_success(f"Cohort density plot -> {args.cohort_plot}")
+        if args.summary:
+            DataAnalyzer.view_store_analysis(store)
+        if args.journey_plot:
+            rows = np.flatnonzero(np.asarray(store.person_ids) == journey_id)
+            if len(rows) == 0:
+                UI.print_error(f"Person ID {journey_id} is not in {args.data}")
+                return 1
+            Visualizations.plot_store_journey(store, rows[0], args.journey_plot[1])
+            UI.print_success(f"Journey of person {journey_id} -> {args.journey_plot[1]}")
+        return 0
+
+    if args.stream:
+        n_persons = BatchSimulator.run_streaming(args.data, args.output, args.steps, args.method,
+                                                 rows=args.stream, workers=args.workers)
+    else:
+        data = WellnessSimulator.read_dataset(args.data)
+        result_cache = ResultCache(args.cache_dir, int(args.cache_size * 2**20)) if args.cache_dir else None
+        results = BatchSimulator.simulate(data, args.steps, args.method,
+                                          workers=args.workers, chunk_size=args.chunk_size,
+                                          result_cache=result_cache)
+        if result_cache is not None:
+            print(f"Result cache: {'hit' if result_cache.hits else 'miss'} ({args.cache_dir})")
+        if args.noise is not None:
+            stochastic = StochasticSimulator(args.noise, args.sde_scheme, args.substeps, args.seed)
+            results[args.sde_scheme] = stochastic.simulate(
+                results['Initial_Anxiety'], results['Initial_Stress'],
+                [category for category, _ in results['schedule']], results['Responsiveness'],
+                workers=args.workers)
+            results['methods'] = results['methods'] + [args.sde_scheme]
+        BatchSimulator.write_results(results, args.output)
+        n_persons = len(data)
+    UI.print_success(f"Simulated {n_persons} persons x {args.steps} steps -> {args.output}")
+    BatchSimulator._report_cache(args.workers)
+    if args.render:
+        # Only in-memory runs get here with --render, so results is set
+        BatchSimulator.render_reports(results, args.render, render_kinds, args.render_format,
+                                      workers=args.workers)
+        UI.print_success(f"Rendered {', '.join(render_kinds)} figures of {n_persons} persons -> {args.render}")
+    if args.cohort_plot:
+        Visualizations.plot_cohort_density(CohortDensity.from_results(results), args.cohort_plot)
+        UI.print_success(f"Cohort density plot -> {args.cohort_plot}")
+    return 0
+
 # -------------------------------
 # 🚀 Main Execution
 # -------------------------------
 
 if __name__ == "__main__":
+    warnings.filterwarnings('ignore')
+
+    # Any command-line arguments select the headless batch mode
+    if len(sys.argv) > 1:
+        sys.exit(run_cli())
+
+    if COLORAMA_AVAILABLE:
+        init(autoreset=True)
+
     try:
         # Run the simulator
         simulator = WellnessSimulator()
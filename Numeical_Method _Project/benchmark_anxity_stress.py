@@ -0,0 +1,269 @@
+"""Benchmarks for the numerical core, data loading and rendering
+
+Examples:
+    python benchmark_anxity_stress.py --output bench.json
+    python benchmark_anxity_stress.py --sizes 1e2,1e4,1e6,1e7 --steps 5,20
+    python benchmark_anxity_stress.py --compare bench.json --threshold 0.10
+
+Every case records wall time (best of --repeat runs), steps/second,
+peak traced memory and right-hand-side evaluations. --compare reads a
+previous JSON run and flags cases that got slower by more than the
+threshold (exit status 1 if any did).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+import matplotlib
+matplotlib.use("Agg")  # Render off-screen; plt.show() becomes a no-op
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import anxity_stress as sim
+
+# Scalar methods run one Python call per person and step, so they are
+# measured on at most this many persons and reported as rates
+SCALAR_LIMIT = 10_000
+# RHS evaluations per step for the fixed-step methods
+RHS_PER_STEP = {"Euler": 1, "RK4": 4}
+
+
+def make_population(n, seed=0):
+    """Random population on the same 2-decimal grid as the dataset"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'PersonID': np.arange(1, n + 1),
+        'Initial_Anxiety': np.round(rng.uniform(1, 10, n), 2),
+        'Initial_Stress': np.round(rng.uniform(1, 10, n), 2),
+        'Responsiveness': np.round(rng.uniform(0.2, 1, n), 2)
+    })
+
+
+def measure(fn, repeat):
+    """Best wall time over repeat runs plus one traced run for peak memory"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def record(name, size, steps, seconds, peak, rhs=None):
+    """One benchmark result row"""
+    return {
+        'name': name,
+        'size': size,
+        'steps': steps,
+        'seconds': seconds,
+        'steps_per_second': size * steps / seconds if steps and seconds > 0 else None,
+        'peak_memory_bytes': peak,
+        'rhs_evaluations': rhs
+    }
+
+
+def bench_scalar(data, steps, repeat):
+    """Per-person Python loop over euler_method / rk4_method"""
+    people = data.head(SCALAR_LIMIT)
+    schedule = [category for category, _ in sim.build_schedule(steps)]
+    rows = []
+    for name, step_fn in (("Euler", sim.WellnessModel.euler_method),
+                          ("RK4", sim.WellnessModel.rk4_method)):
+        def run():
+            for a, s, r in zip(people['Initial_Anxiety'], people['Initial_Stress'],
+                               people['Responsiveness']):
+                for category in schedule:
+                    a, s = step_fn(a, s, category, responsiveness=r)
+        seconds, peak, _ = measure(run, repeat)
+        rows.append(record(f"scalar_{name.lower()}", len(people), steps, seconds, peak,
+                           RHS_PER_STEP[name] * len(people) * steps))
+    return rows
+
+
+def check_compiled_parity(anxiety, stress, responsiveness, schedule):
+    """Fail unless the numba engines match NumPy within sim.COMPILED_TOLERANCE"""
+    for name in ("Euler", "RK4"):
+        compiled, reference = (sim.WellnessModel.integrate(
+            anxiety, stress, schedule, name, responsiveness=responsiveness, backend=backend)
+            for backend in ("numba", "numpy"))
+        error = float(np.max(np.abs(compiled - reference)))
+        if error > sim.COMPILED_TOLERANCE:
+            raise RuntimeError(f"numba {name} differs from NumPy by {error:.3g} "
+                               f"(tolerance {sim.COMPILED_TOLERANCE:g})")
+
+
+def bench_integrate(data, steps, repeat, backends):
+    """Whole-population integrate() for each method and backend"""
+    anxiety = data['Initial_Anxiety'].to_numpy()
+    stress = data['Initial_Stress'].to_numpy()
+    responsiveness = data['Responsiveness'].to_numpy()
+    schedule = [category for category, _ in sim.build_schedule(steps)]
+    rows = []
+    for backend in backends:
+        if backend == "numba":
+            # Compiles outside the timed region and checks the results
+            check_compiled_parity(anxiety, stress, responsiveness, schedule)
+        for name in ("Euler", "RK4"):
+            seconds, peak, _ = measure(lambda: sim.WellnessModel.integrate(
+                anxiety, stress, schedule, name, responsiveness=responsiveness,
+                backend=backend), repeat)
+            rows.append(record(f"integrate_{name.lower()}_{backend}", len(data), steps, seconds,
+                               peak, RHS_PER_STEP[name] * len(data) * steps))
+
+    seconds, peak, result = measure(lambda: sim.WellnessModel.rk45_method(
+        anxiety, stress, schedule, responsiveness=responsiveness), repeat)
+    rows.append(record("integrate_rk45", len(data), steps, seconds, peak, int(np.sum(result[2]))))
+    return rows
+
+
+def bench_loading(data, workdir, repeat):
+    """read_dataset (whole file) and iter_dataset (streamed chunks)"""
+    path = os.path.join(workdir, f"population_{len(data)}.csv")
+    data.to_csv(path, index=False)
+    seconds, peak, _ = measure(lambda: sim.WellnessSimulator.read_dataset(path), repeat)
+    rows = [record("read_dataset", len(data), 0, seconds, peak)]
+
+    def stream():
+        for _ in sim.WellnessSimulator.iter_dataset(path, 100_000):
+            pass
+    seconds, peak, _ = measure(stream, repeat)
+    rows.append(record("iter_dataset", len(data), 0, seconds, peak))
+    os.remove(path)
+    return rows
+
+
+def bench_rendering(steps, repeat):
+    """The three per-person Visualizations figures"""
+    import matplotlib.pyplot as plt
+    euler = sim.WellnessModel.integrate(8.5, 9.0, [c for c, _ in sim.build_schedule(steps)], "Euler")
+    rk4 = sim.WellnessModel.integrate(8.5, 9.0, [c for c, _ in sim.build_schedule(steps)], "RK4")
+    euler_data = {'anxiety': euler[:, 0], 'stress': euler[:, 1]}
+    rk4_data = {'anxiety': rk4[:, 0], 'stress': rk4[:, 1]}
+    techniques = [technique for _, technique in sim.build_schedule(steps)]
+    improvements_euler = (8.5 - euler[-1, 0], 9.0 - euler[-1, 1])
+    improvements_rk4 = (8.5 - rk4[-1, 0], 9.0 - rk4[-1, 1])
+
+    cases = {
+        "plot_wellness_journey": lambda: sim.Visualizations.plot_wellness_journey(
+            steps, euler_data, rk4_data, techniques),
+        "create_report_card": lambda: sim.Visualizations.create_report_card(
+            1, (8.5, 9.0), tuple(rk4[-1]), improvements_rk4, steps, "RK4 Method"),
+        "method_comparison_chart": lambda: sim.Visualizations.method_comparison_chart(
+            improvements_euler, improvements_rk4)
+    }
+    rows = []
+    for name, draw in cases.items():
+        def run():
+            draw()
+            plt.gcf().canvas.draw()
+            plt.close('all')
+        seconds, peak, _ = measure(run, repeat)
+        rows.append(record(name, 1, steps, seconds, peak))
+    return rows
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline run; return the regressed cases"""
+    previous = {(r['name'], r['size'], r['steps']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'case':<40} {'baseline s':>12} {'current s':>12} {'change':>9}")
+    for row in results:
+        key = (row['name'], row['size'], row['steps'])
+        if key not in previous:
+            continue
+        before = previous[key]['seconds']
+        change = row['seconds'] / before - 1 if before > 0 else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        label = f"{row['name']} n={row['size']} steps={row['steps']}"
+        print(f"{label:<40} {before:>12.5f} {row['seconds']:>12.5f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(row)
+    return regressions
+
+
+def parse_ints(text):
+    """Comma separated integers; accepts 1e6 style values"""
+    return [int(float(value)) for value in text.split(",") if value]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1e2,1e4,1e6", type=parse_ints,
+                        help="population sizes (default: 1e2,1e4,1e6; up to 1e7 fits in ~4 GB)")
+    parser.add_argument("--steps", default="5,20", type=parse_ints, help="step counts")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--skip", default="", help="comma separated groups to skip: "
+                        "scalar,integrate,loading,rendering")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON result file")
+    parser.add_argument("--compare", default=None, metavar="BASELINE",
+                        help="previous JSON result to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown fraction that counts as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+    skip = set(args.skip.split(","))
+    warnings.filterwarnings("ignore")  # Emoji glyph / tight_layout noise from the plots
+
+    # Read the baseline first: --output may point at the same file
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    backends = ["numpy"]
+    if sim.WellnessModel._use_compiled("numba"):
+        backends.append("numba")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            data = make_population(size)
+            for steps in args.steps:
+                if "scalar" not in skip:
+                    results += bench_scalar(data, steps, args.repeat)
+                if "integrate" not in skip:
+                    results += bench_integrate(data, steps, args.repeat, backends)
+            if "loading" not in skip:
+                results += bench_loading(data, workdir, args.repeat)
+            print(f"size {size}: done")
+    if "rendering" not in skip:
+        for steps in args.steps:
+            results += bench_rendering(steps, args.repeat)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'backends': backends
+        },
+        'results': results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())